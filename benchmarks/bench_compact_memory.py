@@ -0,0 +1,86 @@
+"""Retained memory of the route catalogue as decoded JSON vs `hketa.compact`.
+
+Builds a synthetic route list and stop lists shaped like the stored data
+(1000 routes, about 3500 stop lists of 35 stops drawn from 6000 stops), then
+measures with `tracemalloc` the memory retained by:
+
+- before: the decoded JSON (`dict`s and `list`s)
+- after: the same data as loaded by `Transport` and `StopCatalogue`
+
+Usage: python benchmarks/bench_compact_memory.py
+"""
+import gc
+import json
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paper_eta.src.libs.hketa import compact  # pylint: disable=wrong-import-position
+
+ROUTES = 1000
+STOPS = 6000
+STOPS_PER_LIST = 35
+
+
+def dataset(seed: int = 1) -> tuple[str, list[str]]:
+    """JSON of the route list and of every stop list."""
+    rng = random.Random(seed)
+    ids = [f"{i:016X}" for i in range(STOPS)]
+
+    def stop(i: int, seq: int) -> dict:
+        return {"id": ids[i], "seq": seq,
+                "name": {"en": f"STOP NAME NUMBER {i} ROAD", "tc": f"第{i}號巴士站道"}}
+
+    routes, stop_lists = {}, []
+    for no in range(ROUTES):
+        routes[str(no)] = {"inbound": [], "outbound": []}
+        for direction in ("inbound", "outbound"):
+            for service_type in range(rng.choice((1, 1, 2, 3))):
+                stops = [rng.randrange(STOPS) for _ in range(STOPS_PER_LIST)]
+                stop_lists.append([stop(x, seq + 1) for seq, x in enumerate(stops)])
+                routes[str(no)][direction].append({
+                    "route_id": f"{no}_{direction}_{service_type}",
+                    "service_type": str(service_type + 1),
+                    "orig": stop(stops[0], 1),
+                    "dest": stop(stops[-1], STOPS_PER_LIST),
+                })
+    return json.dumps(routes), [json.dumps(stops) for stops in stop_lists]
+
+
+def retained(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current
+
+
+def main() -> None:
+    raw_routes, raw_stop_lists = dataset()
+
+    before, before_bytes = retained(lambda: (
+        json.loads(raw_routes),
+        [json.loads(stops) for stops in raw_stop_lists]))
+    after, after_bytes = retained(lambda: (
+        {no: compact.freeze(route) for no, route in json.loads(raw_routes).items()},
+        [compact.freeze(json.loads(stops)) for stops in raw_stop_lists]))
+
+    print(f"{ROUTES} routes, {len(raw_stop_lists)} stop lists of {STOPS_PER_LIST} stops")
+    print(f"  before (dicts):  {before_bytes / 1e6:6.1f} MB")
+    print(f"  after (compact): {after_bytes / 1e6:6.1f} MB"
+          f"  ({before_bytes / after_bytes:.1f}x smaller)")
+
+    last = str(ROUTES - 1)
+    for name, (routes, _) in (("before", before), ("after", after)):
+        seconds = min(timeit.repeat(lambda r=routes: r[last]['outbound'], number=100_000, repeat=5))
+        print(f"  {name} lookup of a route: {seconds / 100_000 * 1e6:.3f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Time of packing a frame buffer by `getbuffer` of the drivers vs `epdcon.packing`.
+
+Packs the image of the tests (`tests.conftest.draw_image`) for each display
+with a controller, in both orientations of its panel (once if it is square):
+
+- before: `getbuffer` of the Waveshare driver (pixel by pixel in Python)
+- after: `packing.pack_1bit` (by PIL in C)
+
+The drivers are imported with a `bus.FakeBackend`, no display is needed.
+
+Usage: python benchmarks/bench_packing.py
+"""
+import importlib
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# pylint: disable=wrong-import-position
+from paper_eta.src.libs.epdcon import bus, packing
+from tests.conftest import draw_image
+
+DRIVERS = ('epd1in02', 'epd1in54', 'epd1in54_V2', 'epd3in7', 'epd4in2b_V2')
+
+
+def best(func, repeat: int = 5) -> float:
+    """Seconds of the fastest of `repeat` calls of `func`."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main() -> None:
+    bus.install(bus.FakeBackend())
+    for name in DRIVERS:
+        epd = importlib.import_module(
+            f"paper_eta.src.libs.epdcon.waveshare.epd_lib.{name}").EPD()
+        for size in dict.fromkeys(((epd.width, epd.height), (epd.height, epd.width))):
+            img = draw_image(size)
+            before = best(lambda e=epd, i=img: e.getbuffer(i))
+            after = best(lambda e=epd, i=img: packing.pack_1bit(i, e.width, e.height))
+            print(f"{name:12} {size[0]:3}x{size[1]:<3}"
+                  f"  getbuffer {before * 1e3:7.2f} ms"
+                  f"  pack_1bit {after * 1e3:6.3f} ms  ({before / after:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
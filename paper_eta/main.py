@@ -1,12 +1,15 @@
+import atexit
 import json
 import urllib.parse
 from datetime import datetime
 from logging.config import dictConfig
 from pathlib import Path
 
+import click
 from flask import Flask
 
 from paper_eta.src import cli, controllers, database, exts, handles, site_data, utils
+from paper_eta.src.libs import refresher
 
 
 def create_app() -> Flask:
@@ -27,6 +30,16 @@ def create_app() -> Flask:
     exts.db.init_app(app)
     exts.hketa.data_path = app.config['HKETA_PATH_DATA']
     exts.hketa.threshold = app.config['HKETA_THRESHOLD']
+    exts.hketa.storage = app.config['HKETA_STORAGE']
+    exts.hketa.eta_ttl.update(app.config['HKETA_ETA_TTL'])
+    exts.hketa.eta_stale = app.config['HKETA_ETA_STALE']
+    exts.hketa.eta_deadline = app.config['HKETA_ETA_DEADLINE']
+    exts.hketa.last_good.max_age = app.config['HKETA_ETA_FALLBACK']
+    if app.config['HKETA_POLLER'] and _is_serving():
+        exts.hketa.poller.interval.update(app.config['HKETA_POLL_INTERVAL'])
+        exts.hketa.poller.source = refresher.enabled_queries
+        exts.hketa.poller.start()
+    atexit.register(exts.hketa.close)
 
     # blueprints registration
     app.register_blueprint(controllers.bookmark.bp)
@@ -41,6 +54,7 @@ def create_app() -> Flask:
     app.cli.add_command(cli.i18n_cli)
     app.cli.add_command(cli.rm_cli)
     app.cli.add_command(cli.db_cli)
+    app.cli.add_command(cli.hketa_cli)
 
     # exception handler registration
     app.register_blueprint(handles.bp)
@@ -72,3 +86,10 @@ def create_app() -> Flask:
         exts.db.session.commit()
 
     return app
+
+
+def _is_serving() -> bool:
+    """Whether the app is created to serve requests (e.g. by gunicorn or
+    `flask run`), instead of for other CLI commands."""
+    ctx = click.get_current_context(silent=True)
+    return ctx is None or ctx.command.name == 'run'
@@ -1,12 +1,17 @@
 import subprocess
 from pathlib import Path
 
+import click
 from flask import current_app
 from flask.cli import AppGroup
 
+from paper_eta.src import exts
+from paper_eta.src.libs.hketa.exceptions import InvalidSnapshot
+
 rm_cli = AppGroup('rm', short_help="Remove cache or config files.")
 db_cli = AppGroup('db', short_help="Database utilities.")
 i18n_cli = AppGroup('i18n', short_help="Translation (Babel) utilities.")
+hketa_cli = AppGroup('hketa', short_help="Route data utilities.")
 
 
 @i18n_cli.command('extract', short_help="Scan for new translations")
@@ -82,3 +87,22 @@ def remove_db():
 @rm_cli.command('config')
 def remove_config():
     current_app.config.get('PATH_SITE_CONF').unlink(missing_ok=True)
+
+
+@hketa_cli.command('export', short_help="Export the route data to a snapshot file")
+@click.argument('fpath', type=click.Path(dir_okay=False, path_type=Path))
+def hketa_export(fpath: Path):
+    header = exts.hketa.export_snapshot(fpath)
+    print(f"Exported {', '.join(header['companies']) or 'nothing'} to {fpath} "
+          f"(sha256: {header['sha256']}).")
+
+
+@hketa_cli.command('import', short_help="Replace the route data by a snapshot file")
+@click.argument('fpath', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def hketa_import(fpath: Path):
+    try:
+        header = exts.hketa.import_snapshot(fpath)
+    except InvalidSnapshot as e:
+        raise click.ClickException(str(e)) from e
+    print(f"Imported {', '.join(header['companies']) or 'nothing'} "
+          f"from snapshot created at {header['created_at']}.")
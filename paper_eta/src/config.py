@@ -60,6 +60,19 @@ SCHEDULER_JOBSTORES = {
 HKETA_PATH_DATA = Path(
     os.getenv('HKETA_PATH_DATA', DIR_STORAGE).joinpath('hketa'))
 HKETA_THRESHOLD = int(os.getenv('HKETA_THRESHOLD', 30))
+HKETA_STORAGE = os.getenv('HKETA_STORAGE', 'json')  # json, sqlite
+HKETA_ETA_TTL = {
+    company: int(os.getenv(f'HKETA_ETA_TTL_{company.upper()}', 15))
+    for company in ('kmb', 'mtr_bus', 'mtr_lrt', 'mtr_train', 'ctb', 'nlb')
+}
+HKETA_ETA_STALE = int(os.getenv('HKETA_ETA_STALE', 30))
+HKETA_ETA_DEADLINE = float(os.getenv('HKETA_ETA_DEADLINE', 5))
+HKETA_ETA_FALLBACK = int(os.getenv('HKETA_ETA_FALLBACK', 600))
+HKETA_POLLER = os.getenv('HKETA_POLLER', 'false').lower() in ('1', 'true', 'yes')
+HKETA_POLL_INTERVAL = {
+    company: int(os.getenv(f'HKETA_POLL_INTERVAL_{company.upper()}', 15))
+    for company in ('kmb', 'mtr_bus', 'mtr_lrt', 'mtr_train', 'ctb', 'nlb')
+}
 
 LOGGING_CONFIG = {
     'version': 1,
@@ -4,7 +4,7 @@ from flask import (Blueprint, Response, flash, redirect, render_template,
                    request, url_for)
 from flask_babel import gettext, lazy_gettext
 
-from paper_eta.src import database, db, forms, site_data
+from paper_eta.src import database, db, exts, forms, site_data
 from paper_eta.src.libs import epdcon
 
 bp = Blueprint('configuration', __name__, url_prefix="/configuration")
@@ -52,6 +52,12 @@ def epd_models(brand: str):
                                models=[])
 
 
+@bp.route('/route-data')
+def route_data():
+    """Status of the background route list refresh of each company."""
+    return exts.hketa.refresh_status()
+
+
 @bp.route('/export')
 def export():
     app_conf = site_data.AppConfiguration()
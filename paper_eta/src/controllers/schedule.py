@@ -219,9 +219,7 @@ def preview(eta_format: str, layout: str):
                    .order_by(database.Bookmark.ordering)
                    .all()]
 
-        etas = [
-            exts.hketa.create_eta_processor(query).etas() for query in queries
-        ]
+        etas = exts.hketa.etas_many(queries)
 
         render = renderer.create(
             app_conf["epd_brand"], app_conf["epd_model"], eta_format, layout)
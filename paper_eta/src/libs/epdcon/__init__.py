@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 from typing import Iterable
 
-from . import controller, waveshare  # DO NOT REMOVE
+from . import bus, controller, packing, waveshare  # DO NOT REMOVE
 from .controller import Controller, Partialable
 
 
@@ -0,0 +1,338 @@
+import logging
+import sys
+import threading
+import time
+import types
+from typing import Callable, Iterable, NamedTuple, Optional, Protocol, Union
+
+Buffer = Union[bytes, bytearray, memoryview, list[int]]
+
+_BACKEND_ATTRS = ('RST_PIN', 'DC_PIN', 'CS_PIN', 'BUSY_PIN', 'PWR_PIN',
+                  'digital_write', 'digital_read', 'delay_ms',
+                  'spi_writebyte', 'spi_writebyte2', 'module_init', 'module_exit')
+
+_EDGE_RECHECK = 1
+"""Seconds to re-read the BUSY pin while waiting for its edge, in case the edge is missed"""
+
+
+class Backend(Protocol):
+    """The pins and GPIO/SPI functions of `epdconfig` (the module itself is a backend)."""
+
+    RST_PIN: int
+    DC_PIN: int
+    CS_PIN: int
+    BUSY_PIN: int
+    PWR_PIN: int
+
+    def digital_write(self, pin: int, value: int) -> None: ...
+
+    def digital_read(self, pin: int) -> int: ...
+
+    def delay_ms(self, delaytime: float) -> None: ...
+
+    def spi_writebyte(self, data: Buffer) -> None: ...
+
+    def spi_writebyte2(self, data: Buffer) -> None: ...
+
+    def module_init(self) -> int: ...
+
+    def module_exit(self) -> None: ...
+
+
+class SpiBus:
+    """
+    Bulk SPI Transport
+    ~~~~~~~~~~~~~~~~~~~~~
+    `SpiBus` sends commands and their data to a display through a `backend`
+    (e.g. `epdconfig`), instead of the `send_command`/`send_data` of the
+    drivers, which toggle DC and CS around every single byte.
+
+    ---
+    The data of a command is sent as one selection of the chip: CS is held
+    low while DC is switched from command to data. Frames are passed as
+    `bytes` (or any buffer) and split into `max_transfer`-sized
+    `memoryview`s, they are not copied into lists of ints.
+    """
+
+    dc_pin: int
+    cs_pin: int
+    max_transfer: int
+    """Maximum bytes per SPI transfer (`bufsiz` of the spidev driver)"""
+
+    def __init__(self,
+                 backend: Backend,
+                 dc_pin: int,
+                 cs_pin: int,
+                 max_transfer: int = 4096) -> None:
+        self.dc_pin = dc_pin
+        self.cs_pin = cs_pin
+        self.max_transfer = max_transfer
+        self._backend = backend
+
+    def send(self, command: int, data: Buffer = b'') -> None:
+        """Send `command` followed by its `data`."""
+        self._backend.digital_write(self.dc_pin, 0)
+        self._backend.digital_write(self.cs_pin, 0)
+        self._backend.spi_writebyte([command])
+        if len(data) > 0:
+            self._backend.digital_write(self.dc_pin, 1)
+            self.write(data)
+        self._backend.digital_write(self.cs_pin, 1)
+
+    def send_many(self, sequence: Iterable[tuple[int, Buffer]]) -> None:
+        """Send the (command, data) pairs of `sequence` in order."""
+        for command, data in sequence:
+            self.send(command, data)
+
+    def write(self, data: Buffer) -> None:
+        """Transfer `data` in chunks of `max_transfer` bytes (DC and CS are not touched)."""
+        if isinstance(data, (list, tuple)):
+            data = bytes(data)
+        view = memoryview(data).cast('B')
+        for start in range(0, len(view), self.max_transfer):
+            self._backend.spi_writebyte2(view[start:start + self.max_transfer])
+
+
+class FakeBackend:
+    """
+    In-process GPIO/SPI Backend
+    ~~~~~~~~~~~~~~~~~~~~~
+    `FakeBackend` stands in for the hardware of `epdconfig`, recording
+    every pin write and SPI transfer, so that the refresh of a display can
+    be run and measured on a machine without one (see `install`).
+
+    ---
+    Delays are recorded without sleeping (unless `realtime`), and the BUSY
+    pin reads idle unless the display is made busy by `busy_for`, with the
+    edge detected as RPi.GPIO does. The time a transfer would take on the
+    wire is estimated from `speed_hz`.
+    """
+
+    class Transfer(NamedTuple):
+        dc: int
+        """Level of the DC pin, `0` for a command and `1` for data"""
+        data: bytes
+        at: float
+        """`time.perf_counter()` when the transfer is made"""
+
+    # same pins as the Raspberry Pi of `epdconfig`
+    RST_PIN = 17
+    DC_PIN = 25
+    CS_PIN = 8
+    BUSY_PIN = 24
+    PWR_PIN = 18
+
+    speed_hz: int
+    """SPI clock of the estimated wire time, 4MHz as `epdconfig`"""
+    transfers: list[Transfer]
+    counts: dict[str, float]
+    """Number of pin writes (`pin_writes`) and reads of the BUSY pin
+    (`busy_reads`), and the milliseconds of the delays (`delay_ms`)"""
+
+    # edges of `add_event_detect`, same values as RPi.GPIO
+    RISING = 31
+    FALLING = 32
+
+    def __init__(self,
+                 speed_hz: int = 4_000_000,
+                 busy_level: int = 1,
+                 edges: bool = True,
+                 realtime: bool = False) -> None:
+        """
+        Args:
+            speed_hz (int, optional): SPI clock of the estimated wire time
+            busy_level (int, optional): level of the BUSY pin while the panel is busy
+            edges (bool, optional): whether edge detection is supported
+                (`add_event_detect` raises `RuntimeError` otherwise)
+            realtime (bool, optional): sleep for the delays instead of only recording them
+        """
+        self.speed_hz = speed_hz
+        self.busy_level = busy_level
+        self.realtime = realtime
+        self.pins: dict[int, int] = {self.BUSY_PIN: 1 - busy_level}
+        # edge and callback of the detected pins, `None` if edge detection is not supported
+        self._callbacks: Optional[dict[int, tuple[int, Callable[[int], None]]]] = \
+            {} if edges else None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the recorded transfers."""
+        self.transfers = []
+        self.counts = {"pin_writes": 0, "busy_reads": 0, "delay_ms": 0}
+
+    def digital_write(self, pin: int, value: int) -> None:
+        self.pins[pin] = value
+        self.counts["pin_writes"] += 1
+
+    def digital_read(self, pin: int) -> int:
+        if pin == self.BUSY_PIN:
+            self.counts["busy_reads"] += 1
+        return self.pins.get(pin, 0)
+
+    def delay_ms(self, delaytime: float) -> None:
+        self.counts["delay_ms"] += delaytime
+        if self.realtime:
+            time.sleep(delaytime / 1000)
+
+    def spi_writebyte(self, data: Buffer) -> None:
+        self.transfers.append(
+            FakeBackend.Transfer(self.pins.get(self.DC_PIN, 0), bytes(data), time.perf_counter()))
+
+    def spi_writebyte2(self, data: Buffer) -> None:
+        self.spi_writebyte(data)
+
+    def module_init(self) -> int:
+        return 0
+
+    def module_exit(self) -> None:
+        pass
+
+    def add_event_detect(self, pin: int, edge: int, callback: Callable[[int], None]) -> None:
+        if self._callbacks is None:
+            raise RuntimeError("Failed to add edge detection")
+        self._callbacks[pin] = (edge, callback)
+
+    def remove_event_detect(self, pin: int) -> None:
+        if self._callbacks is not None:
+            self._callbacks.pop(pin, None)
+
+    def busy_for(self, seconds: float) -> threading.Timer:
+        """Pull the BUSY pin to busy, and release it after `seconds` in a background thread."""
+        self.pins[self.BUSY_PIN] = self.busy_level
+        timer = threading.Timer(seconds, self._set_level, (self.BUSY_PIN, 1 - self.busy_level))
+        timer.start()
+        return timer
+
+    def stream(self) -> list[tuple[int, bytes]]:
+        """The transferred bytes as (DC, bytes) runs, regardless of how they are
+        split into transfers."""
+        runs = []
+        for transfer in self.transfers:
+            if runs and runs[-1][0] == transfer.dc:
+                runs[-1] = (transfer.dc, runs[-1][1] + transfer.data)
+            else:
+                runs.append((transfer.dc, transfer.data))
+        return runs
+
+    def stats(self) -> dict[str, float]:
+        """Number of transfers and bytes, the `counts`, and the estimated wire time."""
+        nbytes = sum(len(t.data) for t in self.transfers)
+        return {
+            "transfers": len(self.transfers),
+            **self.counts,
+            "bytes": nbytes,
+            "wire_seconds": nbytes * 8 / self.speed_hz,
+        }
+
+    def _set_level(self, pin: int, value: int) -> None:
+        previous = self.pins.get(pin, 0)
+        self.pins[pin] = value
+        edge, callback = (self._callbacks or {}).get(pin, (None, None))
+        if (callback is not None and previous != value
+                and edge == (self.RISING if value == 1 else self.FALLING)):
+            callback(pin)
+
+
+def install(backend: Backend) -> None:
+    """Use `backend` as the `epdconfig` of the Waveshare drivers.
+
+    If `epdconfig` is not imported yet, it is never imported (it probes the
+    hardware on import), so that the drivers can be imported on a machine
+    without a display.
+    """
+    name = f"{__package__}.waveshare.epd_lib.epdconfig"
+    if (module := sys.modules.get(name)) is None:
+        module = sys.modules[name] = types.ModuleType(name)
+    module.implementation = backend
+    for attr in _BACKEND_ATTRS:
+        setattr(module, attr, getattr(backend, attr))
+
+
+def wait_idle(backend: Backend,
+              pin: int,
+              busy_level: int = 1,
+              *,
+              query: Optional[Callable[[], None]] = None,
+              poll_ms: float = 20,
+              timeout: Optional[float] = 60) -> None:
+    """Block until the BUSY `pin` leaves `busy_level`, the `ReadBusy` of the drivers.
+
+    The wait is woken up by the edge of the pin where the GPIO library of
+    `backend` supports edge detection (`add_event_detect`), so that the
+    CPU is not kept awake for the whole refresh. Otherwise, the pin is
+    polled every `poll_ms`.
+
+    Args:
+        backend (Backend): `epdconfig` or a `FakeBackend`
+        pin (int): BUSY pin
+        busy_level (int, optional): level of the pin while the display is busy
+        query (Callable, optional): called before every read of the pin,
+            e.g. sending the get-status command some displays require
+        poll_ms (float, optional): milliseconds between the reads of the pin,
+            the longest a wait lasts without being woken up by an edge if `query` is set
+        timeout (float, optional): seconds to wait (much longer than a
+            refresh of any display), `None` to wait forever
+
+    Raises:
+        TimeoutError: the display is still busy after `timeout`
+    """
+    edge = _Edge.open(backend, pin, busy_level)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        while True:
+            if query is not None:
+                query()
+            if backend.digital_read(pin) != busy_level:
+                return
+
+            wait = poll_ms / 1000 if edge is None or query is not None else _EDGE_RECHECK
+            if deadline is not None:
+                if (remaining := deadline - time.monotonic()) <= 0:
+                    raise TimeoutError(f"The display is still busy after {timeout}s.")
+                wait = min(wait, remaining)
+
+            if edge is None:
+                backend.delay_ms(wait * 1000)
+            else:
+                edge.wait(wait)
+    finally:
+        if edge is not None:
+            edge.close()
+
+
+class _Edge:
+
+    def __init__(self, gpio, pin: int) -> None:
+        self._gpio = gpio
+        self._pin = pin
+        self._event = threading.Event()
+
+    @classmethod
+    def open(cls, backend: Backend, pin: int, busy_level: int) -> Optional["_Edge"]:
+        # the GPIO library of `epdconfig` (RPi.GPIO, Jetson.GPIO, Hobot.GPIO), or the backend itself
+        gpio = getattr(backend, 'implementation', backend)
+        gpio = getattr(gpio, 'GPIO', gpio)
+        if not hasattr(gpio, 'add_event_detect'):
+            return None
+
+        edge = cls(gpio, pin)
+        try:
+            # registered before the pin is read, an edge in between is not lost
+            gpio.add_event_detect(pin,
+                                  gpio.FALLING if busy_level == 1 else gpio.RISING,
+                                  callback=edge.set)
+        except RuntimeError as e:
+            logging.debug("Edge detection is not available, polling the BUSY pin: %s", e)
+            return None
+        return edge
+
+    def set(self, _pin: int) -> None:
+        """Wake up the `wait`, the callback of the edge."""
+        self._event.set()
+
+    def wait(self, timeout: float) -> None:
+        self._event.wait(timeout)
+        self._event.clear()
+
+    def close(self) -> None:
+        self._gpio.remove_event_detect(self._pin)
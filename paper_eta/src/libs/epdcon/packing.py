@@ -0,0 +1,100 @@
+import functools
+import itertools
+
+from PIL import Image
+
+PALETTE_7COLOR = ((0, 0, 0), (255, 255, 255), (0, 255, 0), (0, 0, 255),
+                  (255, 0, 0), (255, 255, 0), (255, 128, 0))
+"""Colours of the 7-colour panels (e.g. epd5in65f, epd7in3f), in the order of their codes"""
+
+PALETTE_4COLOR = ((0, 0, 0), (255, 255, 255), (255, 255, 0), (255, 0, 0))
+"""Colours of the 4-colour panels (e.g. epd2in36g, epd7in3g), in the order of their codes"""
+
+
+def pack_1bit(image: Image.Image, width: int, height: int) -> list[int]:
+    """Pack `image` into the 1-bit frame buffer of a `width` x `height` display.
+
+    The output is identical to `getbuffer` of the Waveshare drivers (rows of
+    MSB-first bits, `1` for white), but is packed by PIL in C instead of
+    pixel by pixel in Python:
+
+    - a `width` x `height` image is packed as is
+    - a `height` x `width` image is rotated by 90 degrees to fit the panel
+    - an image of any other size results in a blank (white) buffer
+    """
+    image = image.convert('1')
+    if image.size == (width, height):
+        return list(image.tobytes())
+    if image.size == (height, width):
+        # the drivers map pixel (x, y) to (y, height - x - 1), i.e. a counter-clockwise rotation
+        return list(image.transpose(Image.Transpose.ROTATE_90).tobytes())
+    return [0xFF] * ((width + 7) // 8 * height)
+
+
+def _gray_level(value: int) -> int:
+    # `getbuffer_4Gray` remaps 0xC0 to 0x80 and 0x80 to 0x40 before taking the top 2 bits
+    if value == 0xC0:
+        value = 0x80
+    elif value == 0x80:
+        value = 0x40
+    return value >> 6
+
+
+# bits of the gray levels (0: black, 1: gray2, 2: gray1, 3: white) in the two RAM planes
+_PLANE_LOW = [0xFF if _gray_level(v) & 0b01 else 0x00 for v in range(256)]
+_PLANE_HIGH = [0xFF if _gray_level(v) & 0b10 else 0x00 for v in range(256)]
+
+
+def pack_4gray(image: Image.Image, width: int, height: int) -> tuple[bytes, bytes]:
+    """Pack `image` into the two 1-bit RAM planes (`0x24`, `0x26`) of a
+    `width` x `height` 4-gray display.
+
+    The output is identical to splitting the buffer of `getbuffer_4Gray` as
+    `display_4Gray` of the Waveshare drivers does, but each plane is mapped
+    from the gray levels by a 256-entry table and packed by PIL in C. The
+    image is rotated or blanked by its size as in `pack_1bit`.
+    """
+    image = image.convert('L')
+    if image.size == (height, width):
+        image = image.transpose(Image.Transpose.ROTATE_90)
+    elif image.size != (width, height):
+        blank = b'\xFF' * ((width + 7) // 8 * height)
+        return blank, blank
+    return (image.point(_PLANE_LOW, '1').tobytes(),
+            image.point(_PLANE_HIGH, '1').tobytes())
+
+
+def pack_palette(image: Image.Image,
+                 width: int,
+                 height: int,
+                 palette: tuple[tuple[int, int, int], ...]) -> list[int]:
+    """Pack `image` into the frame buffer of a `width` x `height` multi-colour
+    display, e.g. `PALETTE_7COLOR` or `PALETTE_4COLOR`.
+
+    The output is identical to `getbuffer` of the Waveshare 7-colour and
+    4-colour drivers: the image is quantised (with dithering) to `palette`,
+    and the colour codes are packed as 4-bit nibbles (more than 4 colours)
+    or 2-bit crumbs, MSB-first, each row padded to a byte. The packing is
+    done by PIL in C instead of pixel by pixel in Python.
+
+    The image is rotated by its size as in `pack_1bit`, an image of any
+    other size results in a blank (white) buffer.
+    """
+    bits = 4 if len(palette) > 4 else 2
+    if image.size not in ((width, height), (height, width)):
+        white = palette.index((255, 255, 255))
+        return ([sum(white << shift for shift in range(0, 8, bits))]
+                * ((width * bits + 7) // 8 * height))
+    if image.size != (width, height):
+        image = image.transpose(Image.Transpose.ROTATE_90)
+
+    image = image.convert('RGB').quantize(palette=_palette_image(palette))
+    return list(image.tobytes('raw', f'P;{bits}'))
+
+
+@functools.lru_cache(maxsize=None)
+def _palette_image(palette: tuple[tuple[int, int, int], ...]) -> Image.Image:
+    image = Image.new('P', (1, 1))
+    image.putpalette(tuple(itertools.chain.from_iterable(palette))
+                     + (0, 0, 0) * (256 - len(palette)))
+    return image
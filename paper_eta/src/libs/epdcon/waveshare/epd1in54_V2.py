@@ -6,9 +6,9 @@ from PIL import Image
 sys.path.append(Path(__file__).parent.parent.parent)
 
 try:
-    from .. import controller
+    from .. import bus, controller, packing
 except ImportError:
-    from epdcon import controller
+    from epdcon import bus, controller, packing
 
 
 class Controller(controller.Controller, controller.Partialable):
@@ -27,10 +27,12 @@ class Controller(controller.Controller, controller.Partialable):
         super().__init__(is_partial)
 
         try:
-            from .epd_lib import epd1in54_V2
+            from .epd_lib import epd1in54_V2, epdconfig
         except ImportError:
-            from epd_lib import epd1in54_V2
+            from epd_lib import epd1in54_V2, epdconfig
         self.epdlib = epd1in54_V2.EPD()
+        self.epdlib.ReadBusy = self._read_busy
+        self._epdconfig = epdconfig
 
     def initialize(self):
         if type(self)._inited:
@@ -47,7 +49,7 @@ class Controller(controller.Controller, controller.Partialable):
     def display(self, images: dict[str, Image.Image],):
         if not type(self)._inited:
             raise RuntimeError("The epaper display is not initialized.")
-        self.epdlib.display(self.epdlib.getbuffer(images['0-0-0']))
+        self.epdlib.display(self._getbuffer(images['0-0-0']))
 
     def display_partial(self,
                         old_images: dict[str, Image.Image],
@@ -56,11 +58,17 @@ class Controller(controller.Controller, controller.Partialable):
             raise RuntimeError("The epaper display is not initialized.")
         if self.is_partial:
             self.epdlib.displayPartBaseImage(
-                self.epdlib.getbuffer(old_images['0-0-0']))
-            self.epdlib.displayPart(self.epdlib.getbuffer(images['0-0-0']))
+                self._getbuffer(old_images['0-0-0']))
+            self.epdlib.displayPart(self._getbuffer(images['0-0-0']))
 
     def close(self):
         if not type(self)._inited:
             raise RuntimeError("The epaper display is not initialized.")
         self.epdlib.sleep()
         type(self)._inited = False
+
+    def _getbuffer(self, image: Image.Image) -> list[int]:
+        return packing.pack_1bit(image, self.epdlib.width, self.epdlib.height)
+
+    def _read_busy(self) -> None:
+        bus.wait_idle(self._epdconfig, self.epdlib.busy_pin, 1)
@@ -6,9 +6,9 @@ from PIL import Image
 sys.path.append(Path(__file__).parent.parent.parent)
 
 try:
-    from .. import controller
+    from .. import bus, controller, packing
 except ImportError:
-    from epdcon import controller
+    from epdcon import bus, controller, packing
 
 
 class Controller(controller.Controller, controller.Partialable):
@@ -27,10 +27,13 @@ class Controller(controller.Controller, controller.Partialable):
         super().__init__(is_partial)
 
         try:
-            from .epd_lib import epd3in7
+            from .epd_lib import epd3in7, epdconfig
         except ImportError:
-            from epd_lib import epd3in7
+            from epd_lib import epd3in7, epdconfig
         self.epdlib = epd3in7.EPD()
+        self.epdlib.ReadBusy = self._read_busy
+        self.bus = bus.SpiBus(epdconfig, self.epdlib.dc_pin, self.epdlib.cs_pin)
+        self._epdconfig = epdconfig
 
     def initialize(self):
         if type(self)._inited:
@@ -49,18 +52,51 @@ class Controller(controller.Controller, controller.Partialable):
     def display(self, images: dict[str, Image.Image]):
         if not type(self)._inited:
             raise RuntimeError("The epaper display is not initialized.")
-        self.epdlib.display_4Gray(self.epdlib.getbuffer_4Gray(images['0-0-0']))
+        self._display_4gray(images['0-0-0'])
 
     def display_partial(self,
                         old_images: dict[str, Image.Image],
                         images: dict[str, Image.Image]):
         if not type(self)._inited:
             raise RuntimeError("The epaper display is not initialized.")
-        self.epdlib.display_1Gray(self.epdlib.getbuffer(old_images['0-0-0']))
-        self.epdlib.display_1Gray(self.epdlib.getbuffer(images['0-0-0']))
+        self._display_1gray(self._getbuffer(old_images['0-0-0']))
+        self._display_1gray(self._getbuffer(images['0-0-0']))
 
     def close(self):
         if not type(self)._inited:
             return
         self.epdlib.sleep()
         type(self)._inited = False
+
+    def _getbuffer(self, image: Image.Image) -> list[int]:
+        return packing.pack_1bit(image, self.epdlib.width, self.epdlib.height)
+
+    def _display_1gray(self, buffer: list[int]) -> None:
+        # same sequence as `display_1Gray`
+        self.bus.send_many((
+            (0x4E, b'\x00\x00'),
+            (0x4F, b'\x00\x00'),
+            (0x24, buffer),
+            (0x32, self.epdlib.lut_1Gray_A2),
+            (0x20, b''),
+        ))
+        self.epdlib.ReadBusy()
+
+    def _display_4gray(self, image: Image.Image) -> None:
+        # same sequence as `display_4Gray`, with the planes packed by `packing.pack_4gray`
+        planes = packing.pack_4gray(image, self.epdlib.width, self.epdlib.height)
+        self.bus.send_many((
+            (0x4E, b'\x00\x00'),
+            (0x4F, b'\x00\x00'),
+            (0x24, planes[0]),
+            (0x4E, b'\x00\x00'),
+            (0x4F, b'\x00\x00'),
+            (0x26, planes[1]),
+            (0x32, self.epdlib.lut_4Gray_GC),
+            (0x22, b'\xC7'),
+            (0x20, b''),
+        ))
+        self.epdlib.ReadBusy()
+
+    def _read_busy(self) -> None:
+        bus.wait_idle(self._epdconfig, self.epdlib.busy_pin, 1)
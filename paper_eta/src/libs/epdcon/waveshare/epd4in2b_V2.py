@@ -6,9 +6,9 @@ from PIL import Image
 sys.path.append(Path(__file__).parent.parent.parent)
 
 try:
-    from .. import controller
+    from .. import bus, controller, packing
 except ImportError:
-    from epdcon import controller
+    from epdcon import bus, controller, packing
 
 
 class Controller(controller.Controller):
@@ -26,10 +26,12 @@ class Controller(controller.Controller):
     def __init__(self, is_partial: bool) -> None:
         super().__init__(is_partial)
         try:
-            from .epd_lib import epd4in2b_V2
+            from .epd_lib import epd4in2b_V2, epdconfig
         except ImportError:
-            from epd_lib import epd4in2b_V2
+            from epd_lib import epd4in2b_V2, epdconfig
         self.epdlib = epd4in2b_V2.EPD()
+        self.epdlib.ReadBusy = self._read_busy
+        self._epdconfig = epdconfig
 
     def initialize(self):
         if type(self)._inited:
@@ -44,11 +46,19 @@ class Controller(controller.Controller):
     def display(self, images: dict[str, Image.Image]):
         if not type(self)._inited:
             raise RuntimeError("The epaper display is not initialized.")
-        self.epdlib.display(self.epdlib.getbuffer(images['0-0-0']),
-                            self.epdlib.getbuffer(images['255-0-0']))
+        self.epdlib.display(self._getbuffer(images['0-0-0']),
+                            self._getbuffer(images['255-0-0']))
 
     def close(self):
         if not type(self)._inited:
             raise RuntimeError("The epaper display is not initialized.")
         self.epdlib.sleep()
         type(self)._inited = False
+
+    def _getbuffer(self, image: Image.Image) -> list[int]:
+        return packing.pack_1bit(image, self.epdlib.width, self.epdlib.height)
+
+    def _read_busy(self) -> None:
+        # BUSY is low while busy, and is read after a get-status command as the driver does
+        bus.wait_idle(self._epdconfig, self.epdlib.busy_pin, 0,
+                      query=lambda: self.epdlib.send_command(0x71))
@@ -1,11 +1,13 @@
 
-from . import (api, enums, eta_processor, exceptions, factories, models,
-               transport)
+from . import (api, catalogue, client, compact, enums, eta_processor,
+               exceptions, factories, fetcher, models, planner, poller,
+               refresh, snapshot, storage, transport)
 from .enums import Company, Direction, Locale, StopType
 from .factories import EtaFactory
 from .models import Eta, RouteInfo, RouteQuery
 from .route import Route
 
 __all__ = [
-    api, api, enums, eta_processor, exceptions, factories, models
+    api, api, catalogue, client, compact, enums, eta_processor, exceptions,
+    factories, fetcher, models, planner, poller, refresh, snapshot, storage
 ]
@@ -2,11 +2,29 @@
 This module includes methods to retrive transport related data (e.g. ETA)\
       from data.gov.hk
 """
+import codecs
+import csv
+import json
 import logging
-from typing import Literal
+import re
+from typing import Any, AsyncIterator, Literal, Optional
 
 import aiohttp
 
+# ----------------------------------------
+#            Static Datasets
+# ----------------------------------------
+
+MTR_BUS_STOP_LIST_URL = "https://opendata.mtr.com.hk/data/mtr_bus_stops.csv"
+MTR_BUS_ROUTE_LIST_URL = "https://opendata.mtr.com.hk/data/mtr_bus_routes.csv"
+MTR_LRT_ROUTE_STOP_LIST_URL = "https://opendata.mtr.com.hk/data/light_rail_routes_and_stops.csv"
+MTR_TRAIN_ROUTE_STOP_LIST_URL = "https://opendata.mtr.com.hk/data/mtr_lines_and_stations.csv"
+KMB_ROUTE_LIST_URL = "https://data.etabus.gov.hk/v1/transport/kmb/route/"
+KMB_ROUTE_STOP_LIST_ALL_URL = "https://data.etabus.gov.hk/v1/transport/kmb/route-stop"
+KMB_STOP_LIST_URL = "https://data.etabus.gov.hk/v1/transport/kmb/stop"
+BRAVOBUS_ROUTE_LIST_URL = "https://rt.data.gov.hk/v2/transport/citybus/route/{company}"
+NLB_ROUTE_LIST_URL = "https://rt.data.gov.hk/v2/transport/nlb/route.php?action=list"
+
 # ----------------------------------------
 #               ETA APIs
 # ----------------------------------------
@@ -42,6 +60,34 @@ async def kmb_eta(route: str,
             return await response.json()
 
 
+async def kmb_stop_eta(stop_id: str,
+                       session: aiohttp.ClientSession = None) -> dict:
+    """
+    Fetche KMB/LWB buses ETA (of all routes at a stop) from `ETA Data` API
+
+    KMB API(s): https://data.gov.hk/en-data/dataset/hk-td-tis_21-etakmb
+
+    Args:
+        stop_id (str): stop ID of the bus stop
+        session (aiohttp.ClientSession, optional): client session for HTTP connections
+
+    Returns:
+        dict: see https://data.etabus.gov.hk/datagovhk/kmb_eta_data_dictionary.pdf
+
+    Raises:
+        aiohttp.ClientError: An error occurred when making the HTTP request
+    """
+    url = f"https://data.etabus.gov.hk/v1/transport/kmb/stop-eta/{stop_id}"
+    logging.debug("GET request to '%s'", url)
+
+    if session is None:
+        async with aiohttp.request('GET', url, raise_for_status=True) as response:
+            return await response.json()
+    else:
+        async with session.get(url, raise_for_status=True) as response:
+            return await response.json()
+
+
 async def nlb_eta(route_id: str,
                   stop_id: str | int,
                   language: Literal['en', 'zh', 'cn'] = 'en',
@@ -233,7 +279,7 @@ async def mtr_bus_stop_list(session: aiohttp.ClientSession = None) -> list:
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = "https://opendata.mtr.com.hk/data/mtr_bus_stops.csv"
+    url = MTR_BUS_STOP_LIST_URL
     logging.debug("GET request to '%s'", url)
 
     if session is None:
@@ -259,7 +305,7 @@ async def mtr_bus_route_list(session: aiohttp.ClientSession = None) -> list:
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = "https://opendata.mtr.com.hk/data/mtr_bus_routes.csv"
+    url = MTR_BUS_ROUTE_LIST_URL
     logging.debug("GET request to '%s'", url)
 
     if session is None:
@@ -285,7 +331,7 @@ async def mtr_lrt_route_stop_list(session: aiohttp.ClientSession = None) -> list
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = "https://opendata.mtr.com.hk/data/light_rail_routes_and_stops.csv"
+    url = MTR_LRT_ROUTE_STOP_LIST_URL
     logging.debug("GET request to '%s'", url)
 
     if session is None:
@@ -311,7 +357,7 @@ async def mtr_train_route_stop_list(session: aiohttp.ClientSession = None) -> li
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = "https://opendata.mtr.com.hk/data/mtr_lines_and_stations.csv"
+    url = MTR_TRAIN_ROUTE_STOP_LIST_URL
     logging.debug("GET request to '%s'", url)
 
     if session is None:
@@ -336,7 +382,7 @@ async def kmb_route_list(session: aiohttp.ClientSession = None) -> dict:
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = "https://data.etabus.gov.hk/v1/transport/kmb/route/"
+    url = KMB_ROUTE_LIST_URL
     logging.debug("GET request to '%s'", url)
 
     if session is None:
@@ -422,7 +468,7 @@ async def bravobus_route_list(company: Literal["ctb", "nwfb"],
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = f"https://rt.data.gov.hk/v2/transport/citybus/route/{company}"
+    url = BRAVOBUS_ROUTE_LIST_URL.format(company=company)
     logging.debug("GET request to '%s'", url)
 
     if session is None:
@@ -507,7 +553,7 @@ async def nlb_route_list(session: aiohttp.ClientSession = None) -> dict:
     Raises:
         aiohttp.ClientError: An error occurred when making the HTTP request
     """
-    url = "https://rt.data.gov.hk/v2/transport/nlb/route.php?action=list"
+    url = NLB_ROUTE_LIST_URL
     if session is None:
         async with aiohttp.request('GET', url, raise_for_status=True) as response:
             return await response.json()
@@ -538,3 +584,129 @@ async def nlb_route_stop_list(route_id: str,
     else:
         async with session.get(url, raise_for_status=True) as response:
             return await response.json()
+
+
+# ----------------------------------------
+#           Streaming Datasets
+# ----------------------------------------
+
+async def iter_csv(url: str,
+                   session: aiohttp.ClientSession = None) -> AsyncIterator[list[str]]:
+    """Stream the rows of a CSV dataset line by line, without reading the whole file
+
+    Args:
+        url (str): URL of the dataset (e.g. `MTR_BUS_STOP_LIST_URL`)
+        session (aiohttp.ClientSession, optional): client session for HTTP connections
+
+    Yields:
+        list[str]: columns of a row (header included)
+
+    Raises:
+        aiohttp.ClientError: An error occurred when making the HTTP request
+    """
+    logging.debug("GET request to '%s'", url)
+
+    async with _get(url, session) as response:
+        async for line in response.content:
+            yield next(csv.reader([line.decode("utf-8-sig")]), [])
+
+
+async def iter_json_array(url: str,
+                          key: str = "data",
+                          session: aiohttp.ClientSession = None,
+                          chunk_size: int = 65536) -> AsyncIterator[Any]:
+    """Stream the elements of the array `key` of a JSON dataset, parsing the
+    response incrementally instead of reading the whole document
+
+    The elements of the array are expected to be JSON objects (or arrays).
+
+    Args:
+        url (str): URL of the dataset (e.g. `KMB_ROUTE_STOP_LIST_ALL_URL`)
+        key (str): key of the array in the top-level object
+        session (aiohttp.ClientSession, optional): client session for HTTP connections
+        chunk_size (int): bytes to read from the connection at a time
+
+    Yields:
+        Any: elements of the array
+
+    Raises:
+        aiohttp.ClientError: An error occurred when making the HTTP request
+        ValueError: The response is not a valid JSON document
+    """
+    logging.debug("GET request to '%s'", url)
+    start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+    separator = re.compile(r'[\s,]*')
+    decoder = json.JSONDecoder()
+    decode = codecs.getincrementaldecoder("utf-8")()
+
+    async with _get(url, session) as response:
+        buffer, in_array = "", False
+        async for chunk in response.content.iter_chunked(chunk_size):
+            buffer += decode.decode(chunk)
+            if not in_array:
+                if (match := start.search(buffer)) is None:
+                    # keep the tail, the key could be split between chunks
+                    buffer = buffer[-(len(key) + 64):]
+                    continue
+                buffer, in_array = buffer[match.end():], True
+
+            pos = 0
+            while True:
+                pos = separator.match(buffer, pos).end()
+                if buffer.startswith("]", pos):
+                    return
+                try:
+                    element, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # incomplete element, wait for the next chunk
+                yield element
+            buffer = buffer[pos:]
+    raise ValueError(f"Unexpected end of JSON array '{key}' from {url}")
+
+
+def _get(url: str, session: Optional[aiohttp.ClientSession]):
+    if session is None:
+        return aiohttp.request('GET', url, raise_for_status=True)
+    return session.get(url, raise_for_status=True)
+
+
+# ----------------------------------------
+#          Dataset Revalidation
+# ----------------------------------------
+
+async def revalidate(url: str,
+                     validators: dict[str, str],
+                     session: aiohttp.ClientSession = None) -> Optional[dict[str, str]]:
+    """Check whether a static dataset is modified with a conditional `HEAD` request
+
+    Args:
+        url (str): URL of the dataset
+        validators (dict[str, str]): `ETag` and/or `Last-Modified` of the local copy
+        session (aiohttp.ClientSession, optional): client session for HTTP connections
+
+    Returns:
+        Optional[dict[str, str]]: `None` if the dataset is not modified,
+            otherwise the validators of the latest dataset (could be empty)
+
+    Raises:
+        aiohttp.ClientError: An error occurred when making the HTTP request
+    """
+    headers = {}
+    if 'ETag' in validators:
+        headers['If-None-Match'] = validators['ETag']
+    if 'Last-Modified' in validators:
+        headers['If-Modified-Since'] = validators['Last-Modified']
+    logging.debug("HEAD request to '%s'", url)
+
+    if session is None:
+        async with aiohttp.request('HEAD', url, headers=headers, raise_for_status=True) as response:
+            return _validators(response)
+    else:
+        async with session.head(url, headers=headers, raise_for_status=True) as response:
+            return _validators(response)
+
+
+def _validators(response: aiohttp.ClientResponse) -> Optional[dict[str, str]]:
+    if response.status == 304:
+        return None
+    return {k: response.headers[k] for k in ('ETag', 'Last-Modified') if k in response.headers}
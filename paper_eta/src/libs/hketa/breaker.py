@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+
+class CircuitOpen(aiohttp.ClientError):
+    """The request is rejected since the upstream host is failing"""
+
+
+class CircuitBreaker:
+    """
+    Per-host Circuit Breaker
+    ~~~~~~~~~~~~~~~~~~~~~
+    `CircuitBreaker` stops requests to an upstream host after it failed
+    `threshold` times in a row, so that a failing API is not waited for on
+    every refresh.
+
+    ---
+    After `cooldown` seconds, a single trial request is let through: the
+    circuit is closed again if it succeeds, otherwise it stays open for
+    another `cooldown`.
+
+    The breaker is not thread-safe, it is meant to be used within a single
+    event loop.
+    """
+
+    threshold: int
+    """Number of consecutive failures before requests to the host are stopped"""
+    cooldown: float
+    """Seconds to stop requests to a failing host before trying again"""
+
+    def __init__(self, threshold: int = 3, cooldown: float = 60) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+
+    def allow(self, host: str) -> bool:
+        """Whether a request to `host` should be made."""
+        if (opened_at := self._opened_at.get(host)) is None:
+            return True
+        if time.monotonic() - opened_at < self.cooldown:
+            return False
+        # half-open: let one request through, and wait another `cooldown` for the others
+        self._opened_at[host] = time.monotonic()
+        return True
+
+    def record_success(self, host: str) -> None:
+        self._failures.pop(host, None)
+        if self._opened_at.pop(host, None) is not None:
+            logging.info("%s is recovered, circuit closed.", host)
+
+    def record_failure(self, host: str) -> None:
+        self._failures[host] = self._failures.get(host, 0) + 1
+        if self._failures[host] < self.threshold:
+            return
+        if host not in self._opened_at:
+            logging.warning("%s failed %d times in a row, circuit opened for %ds.",
+                            host, self._failures[host], self.cooldown)
+        self._opened_at[host] = time.monotonic()
+
+    def state(self, host: str) -> str:
+        """State of the circuit of `host`: "closed", "open" or "half-open"."""
+        if (opened_at := self._opened_at.get(host)) is None:
+            return "closed"
+        return "open" if time.monotonic() - opened_at < self.cooldown else "half-open"
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Create a `TraceConfig` applying the breaker to the requests of a session."""
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_exception)
+        return trace
+
+    async def _on_request_start(self, _session, _context, params) -> None:
+        if not self.allow(params.url.host):
+            raise CircuitOpen(f"Circuit of {params.url.host} is open.")
+
+    async def _on_request_end(self, _session, _context, params) -> None:
+        self._record_status(params.url.host, params.response.status)
+
+    async def _on_request_exception(self, _session, _context, params) -> None:
+        if isinstance(params.exception, aiohttp.ClientResponseError):
+            # raised by `raise_for_status` instead of ending the request
+            self._record_status(params.url.host, params.exception.status)
+        elif not isinstance(params.exception, asyncio.CancelledError):
+            self.record_failure(params.url.host)
+
+    def _record_status(self, host: str, status: int) -> None:
+        # only a throttled or failing host counts, not a bad request (e.g. an unknown stop)
+        if status == 429 or status >= 500:
+            self.record_failure(host)
+        else:
+            self.record_success(host)
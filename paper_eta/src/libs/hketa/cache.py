@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Hashable, NamedTuple, Optional
+
+import pytz
+
+try:
+    from .models import Eta
+except (ImportError, ModuleNotFoundError):
+    from models import Eta
+
+
+class TtlCache:
+    """
+    Response Cache
+    ~~~~~~~~~~~~~~~~~~~~~
+    `TtlCache` is a size bounded, least-recently-used cache that remembers
+    when each entry was stored, leaving the freshness decision to the caller.
+
+    ---
+    The cache is not thread-safe, it is meant to be used within a single
+    event loop.
+    """
+
+    class Entry(NamedTuple):
+        value: Any
+        stored_at: float
+
+        def age(self) -> float:
+            return time.monotonic() - self.stored_at
+
+    maxsize: int
+    """Maximum number of entries, the least recently used one is evicted when exceeded"""
+    hits: int
+    """Number of lookups served with a fresh entry"""
+    stale_hits: int
+    """Number of lookups served with an expired entry while it is being revalidated"""
+    misses: int
+    """Number of lookups that have to wait for the upstream"""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.hits = self.stale_hits = self.misses = 0
+        self._entries: OrderedDict[Hashable, TtlCache.Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Entry]:
+        if (entry := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = TtlCache.Entry(value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+        }
+
+
+class LastGoodEtas:
+    """
+    Last Known Good ETAs
+    ~~~~~~~~~~~~~~~~~~~~~
+    `LastGoodEtas` keeps the latest successfully fetched `Eta` of every
+    route, to fall back on when a fetch is failed or is too slow.
+
+    ---
+    The absolute ETA times are still valid after the fetch, so a cached
+    `Eta` is served with the departed times removed, arriving state
+    recalculated against now and `is_stale` set.
+
+    The cache is not thread-safe, it is meant to be used within a single
+    event loop.
+    """
+
+    max_age: float
+    """Seconds after the fetch that an `Eta` is still served"""
+    maxsize: int
+    """Maximum number of routes, the least recently updated one is evicted when exceeded"""
+
+    def __init__(self, max_age: float = 600, maxsize: int = 128) -> None:
+        self.max_age = max_age
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Eta] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: Hashable, eta: Eta) -> None:
+        if not isinstance(eta.etas, list):
+            return
+        self._entries[key] = eta
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Eta]:
+        """Get the last good `Eta` of `key` rebased to now, `None` if there
+        is none, it is too old or all its ETAs are departed.
+        """
+        if (eta := self._entries.get(key)) is None:
+            return None
+
+        now = datetime.now().replace(tzinfo=pytz.timezone('Etc/GMT-8'))
+        if now - eta.timestamp > timedelta(seconds=self.max_age):
+            del self._entries[key]
+            return None
+
+        times = [t.model_copy(update={'is_arriving': (t.eta - now).total_seconds() < 60})
+                 if t.eta is not None else t
+                 for t in eta.etas
+                 if t.eta is None or t.eta >= now]
+        if len(eta.etas) > 0 and len(times) == 0:
+            return None
+        return eta.model_copy(update={'etas': times, 'timestamp': now, 'is_stale': True})
+
+    def clear(self) -> None:
+        self._entries.clear()
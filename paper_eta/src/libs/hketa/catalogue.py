@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, NamedTuple, Optional
+
+try:
+    from . import compact
+    from .models import RouteInfo
+    from .storage import StopListKey, Storage
+except (ImportError, ModuleNotFoundError):
+    import compact
+    from models import RouteInfo
+    from storage import StopListKey, Storage
+
+
+class StopCatalogue:
+    """
+    Stop List Catalogue
+    ~~~~~~~~~~~~~~~~~~~~~
+    `StopCatalogue` keeps the stop lists of a `Storage` in memory, indexed by
+    (route, direction, service type) and by stop ID, so that the stored data
+    are read once instead of for every `Route`.
+
+    ---
+    A cached stop list is reloaded when it is rewritten in the storage (e.g.
+    file modified). To avoid touching the disk on every lookup, the storage is
+    only checked once every `recheck` seconds.
+    """
+
+    class Entry(NamedTuple):
+        stops: tuple[RouteInfo.Stop]
+        index: dict[str, RouteInfo.Stop]
+        """Stops by stop ID, in the same order as `stops`"""
+        last_update: datetime
+        stamp: Hashable
+        checked_at: float
+
+    recheck: float
+    """Seconds between checks of the storage for changes"""
+
+    def __init__(self, storage: Storage, recheck: float = 60) -> None:
+        self.storage = storage
+        self.recheck = recheck
+        self._lock = threading.Lock()
+        self._entries: dict[StopListKey, StopCatalogue.Entry] = {}
+
+    def get(self, key: StopListKey) -> Optional[Entry]:
+        """Get the stop list of `key`, loading it from the storage when it is
+        not cached or has been changed.
+
+        Returns `None` if the stop list is not stored.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.checked_at < self.recheck:
+            return entry
+
+        if (stamp := self.storage.stamp(*key)) is None:
+            return None
+
+        if entry is not None and entry.stamp == stamp:
+            entry = entry._replace(checked_at=time.monotonic())
+        else:
+            if (data := self.storage.load_stops(*key)) is None:
+                return None
+            entry = self._entry(data['data'],
+                                datetime.fromisoformat(data['last_update']),
+                                stamp)
+
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def put(self, key: StopListKey, data: dict) -> Entry:
+        """Write the stop list `data` to the storage and cache it."""
+        self.storage.save_stops(*key, data)
+        entry = self._entry(data['data'],
+                            datetime.fromisoformat(data['last_update']),
+                            self.storage.stamp(*key))
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _entry(stops: tuple[RouteInfo.Stop],
+               last_update: datetime,
+               stamp: Hashable) -> Entry:
+        stops = compact.freeze(stops)
+        return StopCatalogue.Entry(stops=stops,
+                                   index={stop['id']: stop for stop in stops},
+                                   last_update=last_update,
+                                   stamp=stamp,
+                                   checked_at=time.monotonic())
+
+
+class StopDetailsStore:
+    """
+    Stop Details Store
+    ~~~~~~~~~~~~~~~~~~~~~
+    `StopDetailsStore` keeps the details (e.g. names) of the stops of a company
+    by stop ID, so that a stop shared by hundreds of routes is fetched once
+    instead of once for every route.
+
+    ---
+    Fetched details are persisted to the storage on `flush`. Concurrent
+    lookups of the same stop (within an event loop) share a single request.
+    """
+
+    def __init__(self, storage: Storage) -> None:
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._details: Optional[dict[str, dict]] = None
+        self._last_update: Optional[datetime] = None
+        self._dirty = False
+        self._inflight: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    @property
+    def last_update(self) -> Optional[datetime]:
+        """When the store was started to fill, `None` if it is empty"""
+        self._load()
+        return self._last_update
+
+    async def get(self, stop_id: str, fetch: Callable[[str], Awaitable[dict]]) -> dict:
+        """Get the details of `stop_id`, calling `fetch` when it is not stored."""
+        if (details := self._load().get(stop_id)) is not None:
+            return details
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            inflight = self._inflight.get(stop_id)
+            if inflight is None or inflight[0] is not loop:
+                task = loop.create_task(fetch(stop_id))
+                task.add_done_callback(lambda t: self._on_fetched(stop_id, t))
+                self._inflight[stop_id] = (loop, task)
+            else:
+                task = inflight[1]
+        return await asyncio.shield(task)
+
+    def update(self, details: dict[str, dict]) -> None:
+        """Store the details of many stops (by stop ID) at once."""
+        self._load()
+        with self._lock:
+            self._details.update(details)
+            self._last_update = self._last_update or datetime.now()
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Write the newly fetched details to the storage."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'last_update': self._last_update.isoformat(timespec="seconds"),
+                'data': dict(self._details),
+            }
+            self._dirty = False
+        self.storage.save_stop_details(data)
+
+    def clear(self) -> None:
+        """Drop all the details, they are fetched again on demand."""
+        with self._lock:
+            self._details = {}
+            self._last_update = datetime.now()
+            self._dirty = True
+
+    def reload(self) -> None:
+        """Drop the details in memory (including the unflushed ones), they are
+        read again from the storage on demand."""
+        with self._lock:
+            self._details = None
+            self._last_update = None
+            self._dirty = False
+
+    def _load(self) -> dict[str, dict]:
+        if self._details is None:
+            with self._lock:
+                if self._details is None:
+                    data = self.storage.load_stop_details()
+                    if data is not None:
+                        self._last_update = datetime.fromisoformat(data['last_update'])
+                    self._details = {} if data is None else data['data']
+        return self._details
+
+    def _on_fetched(self, stop_id: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._inflight.get(stop_id, (None, None))[1] is task:
+                del self._inflight[stop_id]
+            if (task.cancelled() or task.exception() is not None
+                    or self._details is None):
+                return
+            self._details[stop_id] = task.result()
+            self._last_update = self._last_update or datetime.now()
+            self._dirty = True
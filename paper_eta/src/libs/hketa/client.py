@@ -0,0 +1,193 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+from typing import Any, Awaitable, Hashable, Optional, TypeVar
+
+import aiohttp
+
+try:
+    from .breaker import CircuitBreaker
+    from .cache import TtlCache
+except (ImportError, ModuleNotFoundError):
+    from breaker import CircuitBreaker
+    from cache import TtlCache
+
+T = TypeVar("T")
+
+
+def request_key(request: functools.partial) -> Hashable:
+    """Get the identity of an API call.
+
+    Since every API function maps its arguments to exactly one URL and
+    parameters, calls to the same function with the same arguments are
+    requests to the same upstream resource.
+    """
+    return (request.func.__module__,
+            request.func.__qualname__,
+            request.args,
+            tuple(sorted(request.keywords.items())))
+
+
+class HttpClient:
+    """
+    Pooled HTTP Client
+    ~~~~~~~~~~~~~~~~~~~~~
+    `HttpClient` owns a long-lived `aiohttp.ClientSession` running on a
+    background event loop, so that connections (and DNS lookups) to the APIs
+    are kept alive and reused across requests, instead of paying a new TCP+TLS
+    handshake for every ETA poll.
+
+    ---
+    The client is started lazily by the first `run` and is safe to be used
+    from multiple threads.
+    """
+
+    limit_per_host: int
+    """Maximum number of simultaneous connections to the same host"""
+    keepalive_timeout: float
+    """Seconds to keep an idle connection open for reuse"""
+    dns_ttl: int
+    """Seconds to cache the resolved DNS records"""
+    timeout: float
+    """Seconds before a request is timed out"""
+    cache: TtlCache
+    """Cache of the API responses"""
+    breaker: CircuitBreaker
+    """Circuit breaker of the upstream hosts"""
+
+    def __init__(self,
+                 limit_per_host: int = 4,
+                 keepalive_timeout: float = 60,
+                 dns_ttl: int = 300,
+                 timeout: float = 15,
+                 cache_size: int = 128) -> None:
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout
+        self.cache = TtlCache(cache_size)
+        self.breaker = CircuitBreaker()
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, only usable within the background event loop."""
+        if self._session is None:
+            raise RuntimeError("The HTTP client is not started.")
+        return self._session
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start the background event loop and the shared session."""
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever,
+                                            name="hketa-http",
+                                            daemon=True)
+            self._thread.start()
+            self._session = asyncio.run_coroutine_threadsafe(
+                self._create_session(), self._loop).result()
+            logging.debug("HTTP client started.")
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run `coro` on the background event loop and wait for its result."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def submit(self, coro: Awaitable[T]) -> concurrent.futures.Future[T]:
+        """Run `coro` on the background event loop without waiting for it."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def fetch(self,
+                    request: functools.partial,
+                    ttl: float = 0,
+                    stale: float = 0) -> Any:
+        """Call the API `request` with the shared session.
+
+        Identical requests (see `request_key`) made while one is in flight
+        share that request and its parsed payload instead of sending another.
+        Must be awaited within the background event loop.
+
+        Args:
+            request (functools.partial): API function with its arguments
+            ttl (float, optional): seconds a cached response is served without
+                requesting again, `0` to bypass the cache
+            stale (float, optional): seconds after `ttl` that a cached response
+                is still served while it is revalidated in the background
+        """
+        key = request_key(request)
+
+        if ttl > 0 and (entry := self.cache.get(key)) is not None:
+            if entry.age() <= ttl:
+                self.cache.hits += 1
+                return entry.value
+            if entry.age() <= ttl + stale:
+                self.cache.stale_hits += 1
+                self._request(key, request)
+                return entry.value
+        if ttl > 0:
+            self.cache.misses += 1
+
+        # one waiter being cancelled should not cancel the others
+        return await asyncio.shield(self._request(key, request))
+
+    def is_fresh(self, request: functools.partial, ttl: float) -> bool:
+        """Whether a response of `request` younger than `ttl` is cached."""
+        entry = self.cache.get(request_key(request)) if ttl > 0 else None
+        return entry is not None and entry.age() <= ttl
+
+    def _request(self, key: Hashable, request: functools.partial) -> asyncio.Future:
+        if (future := self._inflight.get(key)) is not None:
+            logging.debug("Coalesced request: %s%s",
+                          request.func.__name__, request.args)
+            return future
+
+        def on_done(future: asyncio.Future) -> None:
+            self._inflight.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self.cache.put(key, future.result())
+
+        future = asyncio.ensure_future(request(session=self.session))
+        future.add_done_callback(on_done)
+        self._inflight[key] = future
+        return future
+
+    def close(self) -> None:
+        """Close the shared session and stop the background event loop."""
+        with self._lock:
+            if self._thread is None:
+                return
+
+            asyncio.run_coroutine_threadsafe(
+                self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+            self._loop = self._thread = self._session = None
+            self._inflight.clear()
+            logging.debug("HTTP client closed.")
+
+    async def _create_session(self) -> aiohttp.ClientSession:
+        # the connector must be created within the running loop
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=self.limit_per_host,
+                                           keepalive_timeout=self.keepalive_timeout,
+                                           use_dns_cache=True,
+                                           ttl_dns_cache=self.dns_ttl),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[self.breaker.trace_config()])
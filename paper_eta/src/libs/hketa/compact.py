@@ -0,0 +1,106 @@
+import sys
+import weakref
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+_MAX_RECORD_KEYS = 16
+"""Mappings with more keys (e.g. by route number or stop ID) are kept as `dict`s"""
+_MAX_KEY_SETS = 256
+"""Maximum number of key tuples to be shared, the key sets of the records are few and fixed"""
+
+_keys_pool: dict[tuple[str, ...], tuple[str, ...]] = {}
+_records_pool: "weakref.WeakValueDictionary[tuple, Record]" = weakref.WeakValueDictionary()
+
+
+class Record(Mapping):
+    """
+    Compact Record
+    ~~~~~~~~~~~~~~~~~~~~~
+    `Record` is a read-only mapping for the route data (e.g. `RouteInfo`,
+    `RouteInfo.Bound`, `RouteInfo.Stop` and the names of stops).
+
+    ---
+    Instead of a hash table for every route and stop, a record only keeps a
+    tuple of values, the keys are shared by all the records of the same shape.
+    Records should be created by `freeze`, so that the identical ones (e.g.
+    names of the same stop) are the same object.
+
+    A lookup scans the keys, records are only meant for small mappings.
+    """
+
+    __slots__ = ("_keys", "_values", "__weakref__")
+
+    def __init__(self, keys: tuple[str, ...], values: tuple) -> None:
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        # keys could be `str` enums (e.g. `Locale`, `Direction`)
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __hash__(self) -> int:
+        return hash((self._keys, self._values))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return self._keys == other._keys and self._values == other._values
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __reduce__(self):
+        return (dict, (dict(self.items()), ))
+
+
+def freeze(data: Any) -> Any:
+    """Convert the (JSON decoded) route data into a compact, read-only form.
+
+    Small `dict`s become `Record`s, `list`s become `tuple`s and strings are
+    interned. Identical leaf records (e.g. names of the same stop) are
+    deduplicated across all the frozen data. Mappings larger than
+    `_MAX_RECORD_KEYS` stay `dict`s (of frozen values) for constant-time
+    lookups.
+    """
+    if isinstance(data, str):
+        return sys.intern(data)
+    if isinstance(data, Mapping):
+        if len(data) > _MAX_RECORD_KEYS:
+            return {k: freeze(v) for k, v in data.items()}
+        # `getattr` to convert enum keys (e.g. `Locale.EN`) to their values
+        keys = _share(tuple(sys.intern(str(getattr(k, 'value', k))) for k in data.keys()))
+        values = tuple(freeze(v) for v in data.values())
+        if any(isinstance(v, (Record, tuple)) for v in values):
+            # only the leaves (e.g. names) are likely to repeat,
+            # pooling the others costs more memory than it saves
+            return Record(keys, values)
+        return _intern(keys, values)
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(v) for v in data)
+    return data
+
+
+def _share(keys: tuple[str, ...]) -> tuple[str, ...]:
+    if (shared := _keys_pool.get(keys)) is not None:
+        return shared
+    # bounded, key sets that are not fixed (e.g. route numbers) must not pile up
+    if len(_keys_pool) < _MAX_KEY_SETS:
+        _keys_pool[keys] = keys
+    return keys
+
+
+def _intern(keys: tuple[str, ...], values: tuple) -> Record:
+    record = Record(keys, values)
+    try:
+        return _records_pool.setdefault((keys, values), record)
+    except TypeError:  # unhashable values
+        return record
@@ -1,17 +1,20 @@
 import asyncio
+import functools
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Literal, Union
+from typing import Literal, Optional, Union
 
 import pytz
 
 try:
     from . import api
+    from .client import HttpClient
     from .enums import Locale, StopType
     from .models import Eta
     from .route import Route
 except (ImportError, ModuleNotFoundError):
     import api
+    from client import HttpClient
     from enums import Locale, StopType
     from models import Eta
     from route import Route
@@ -41,10 +44,51 @@ class EtaProcessor(ABC):
     def __init__(self, route: Route) -> None:
         self._route = route
 
-    @abstractmethod
     def etas(self) -> Eta:
         """Return processed ETAs
         """
+        return asyncio.run(self.aetas())
+
+    async def aetas(self,
+                    client: Optional[HttpClient] = None,
+                    ttl: float = 0,
+                    stale: float = 0,
+                    request: Optional[functools.partial] = None) -> Eta:
+        """Return processed ETAs, fetching through `client` when provided.
+
+        Coroutine version of `etas`, allowing ETAs of multiple routes to be
+        retrived concurrently within the same event loop. Identical requests
+        made through the same `client` at the same time are sent only once.
+        See `HttpClient.fetch` for `ttl` and `stale`.
+
+        `request` (one of the `requests`) replaces the default API call,
+        e.g. to share a call with the ETAs of other routes.
+        """
+        request = request or self._request()
+        if client is None:
+            return self._parse(await request())
+        return self._parse(await client.fetch(request, ttl, stale))
+
+    def requests(self) -> list[functools.partial]:
+        """Get the API calls that any of them provides the raw ETA data,
+        in order of preference.
+        """
+        return [self._request()]
+
+    def error(self, code: Literal["api-error", "empty", "eos", "ss-effect"]) -> Eta:
+        """Return an ETA of the route with the error `code`
+        """
+        return self._g_eta(Eta.Error(message=self._em(code), code=code))
+
+    @abstractmethod
+    def _request(self) -> functools.partial:
+        """Return the API call (with its arguments) of the raw ETA data
+        """
+
+    @abstractmethod
+    def _parse(self, response: dict) -> Eta:
+        """Process the raw ETA data returned by the `_request`
+        """
 
     def _g_eta(self,
                etas: Union[list[Eta.Time], Eta.Error]) -> Eta:
@@ -82,28 +126,35 @@ class KmbEta(EtaProcessor):
 
     _locale_map = {Locale.TC: "tc", Locale.EN: "en"}
 
-    def etas(self):
-        response = asyncio.run(
-            api.kmb_eta(self.route.entry.no, self.route.entry.service_type))
+    def requests(self):
+        # ETAs of all routes at the stop, shared by the routes at the same stop
+        return [self._request(), functools.partial(api.kmb_stop_eta, self.route.entry.stop_id)]
+
+    def _request(self):
+        return functools.partial(api.kmb_eta, self.route.entry.no, self.route.entry.service_type)
 
+    def _parse(self, response):
         if len(response) == 0:
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+            return self.error("api-error")
         if response.get('data') is None:
-            return self._g_eta(Eta.Error(message=self._em("empty")))
+            return self.error("empty")
 
         etas = []
         timestamp = datetime.fromisoformat(response['generated_timestamp'])
         locale = self._locale_map[self.route.entry.locale]
 
         for stop in response['data']:
-            if (stop["seq"] != self.route.stop_seq()
+            # the response is either by route (`kmb_eta`) or by stop (`kmb_stop_eta`)
+            if (stop["route"] != self.route.entry.no
+                    or str(stop["service_type"]) != str(self.route.entry.service_type)
+                    or stop["seq"] != self.route.stop_seq()
                     or stop["dir"] != self.route.entry.direction[0].upper()):
                 continue
             if stop["eta"] is None:
                 if stop[f'rmk_en'] == "The final bus has departed from this stop":
-                    return self._g_eta(Eta.Error(message=self._em("eos")))
+                    return self.error("eos")
                 elif stop[f'rmk_en'] == "":
-                    return self._g_eta(Eta.Error(message=self._em("empty")))
+                    return self.error("empty")
                 return self._g_eta(Eta.Error(message=stop[f'rmk_{locale}']))
 
             eta_dt = datetime.fromisoformat(stop["eta"])
@@ -130,15 +181,16 @@ class MtrBusEta(EtaProcessor):
 
     _locale_map = {Locale.TC: "zh", Locale.EN: "en"}
 
-    def etas(self):
-        response = asyncio.run(
-            api.mtr_bus_eta(self.route.name(), self._locale_map[self.route.entry.locale]))
+    def _request(self):
+        return functools.partial(
+            api.mtr_bus_eta, self.route.name(), self._locale_map[self.route.entry.locale])
 
+    def _parse(self, response):
         if len(response) == 0:
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+            return self.error("api-error")
         if response["routeStatusRemarkTitle"] is not None:
             if response["routeStatusRemarkTitle"] in ("\u505c\u6b62\u670d\u52d9", "Non-service hours"):
-                return self._g_eta(Eta.Error(message=self._em("eos")))
+                return self.error("eos")
             return self._g_eta(Eta.Error(message=response["routeStatusRemarkTitle"]))
 
         etas = []
@@ -184,13 +236,15 @@ class MtrLrtEta(EtaProcessor):
 
     _locale_map = {Locale.TC: "ch", Locale.EN: "en"}
 
-    def etas(self):
-        response = asyncio.run(api.mtr_lrt_eta(self.route.entry.stop_id))
+    def _request(self):
+        return functools.partial(api.mtr_lrt_eta, self.route.entry.stop_id)
+
+    def _parse(self, response):
         if len(response) == 0 or response.get('status', 0) == 0:
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+            return self.error("api-error")
         if all(platform.get("end_service_status", False)
                for platform in response['platform_list']):
-            return self._g_eta(Eta.Error(message=self._em("eos")))
+            return self.error("eos")
 
         etas = []
         cnt_stopped = 0
@@ -250,7 +304,7 @@ class MtrLrtEta(EtaProcessor):
         # if ((len(response['platform_list']) == 1 and cnt_stopped == 1)
         #         or cnt_stopped >= 2):
         if cnt_stopped > 0:
-            return self._g_eta(Eta.Error(message=self._em("eos")))
+            return self.error("eos")
 
 
 class MtrTrainEta(EtaProcessor):
@@ -262,24 +316,25 @@ class MtrTrainEta(EtaProcessor):
         self.linename = self.route.entry.no.split("-")[0]
         self.direction = self._bound_map[self.route.entry.direction]
 
-    def etas(self):
-        response = asyncio.run(
-            api.mtr_train_eta(self.linename,
-                              self.route.entry.stop_id,
-                              self.route.entry.locale.value))
+    def _request(self):
+        return functools.partial(api.mtr_train_eta,
+                                 self.linename,
+                                 self.route.entry.stop_id,
+                                 self.route.entry.locale.value)
 
+    def _parse(self, response):
         if len(response) == 0:
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+            return self.error("api-error")
         if response.get('status', 0) == 0:
             if "suspended" in response['message']:
                 # raise exceptions.StationClosed(response['message'])
                 return self._g_eta(Eta.Error(message=response['message']))
             if response.get('url') is not None:
-                return self._g_eta(Eta.Error(message=self._em("ss-effect")))
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+                return self.error("ss-effect")
+            return self.error("api-error")
 
         if response['data'][f'{self.linename}-{self.route.entry.stop_id}'].get(self.direction) is None:
-            return self._g_eta(Eta.Error(message=self._em("empty")))
+            return self.error("empty")
 
         etas = []
         timestamp = datetime.fromisoformat(response["curr_time"]).astimezone(
@@ -307,14 +362,15 @@ class BravoBusEta(EtaProcessor):
 
     _locale_map = {Locale.TC: "tc", Locale.EN: "en"}
 
-    def etas(self):
-        response = asyncio.run(
-            api.bravobus_eta(self.route.entry.transport.value, self.route.entry.stop_id, self.route.entry.no))
+    def _request(self):
+        return functools.partial(
+            api.bravobus_eta, self.route.entry.transport.value, self.route.entry.stop_id, self.route.entry.no)
 
+    def _parse(self, response):
         if len(response) == 0 or response.get('data') is None:
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+            return self.error("api-error")
         if len(response['data']) == 0:
-            return self._g_eta(Eta.Error(message=self._em("empty")))
+            return self.error("empty")
 
         etas = []
         timestamp = datetime.fromisoformat(response['generated_timestamp'])
@@ -351,15 +407,18 @@ class NlbEta(EtaProcessor):
 
     _lang_map = {Locale.TC: 'zh', Locale.EN: 'en', }
 
-    def etas(self):
-        response = asyncio.run(
-            api.nlb_eta(self.route.id(), self.route.entry.stop_id, self._lang_map[self.route.entry.locale]))
+    def _request(self):
+        return functools.partial(api.nlb_eta,
+                                 self.route.id(),
+                                 self.route.entry.stop_id,
+                                 self._lang_map[self.route.entry.locale])
 
+    def _parse(self, response):
         if len(response) == 0:
             # incorrect parameter will result in a empty json response
-            return self._g_eta(Eta.Error(message=self._em("api-error")))
+            return self.error("api-error")
         if not response.get('estimatedArrivals', []):
-            return self._g_eta(Eta.Error(message=self._em("empty")))
+            return self.error("empty")
 
         etas = []
         timestamp = datetime.now().replace(tzinfo=pytz.timezone('Etc/GMT-8'))
@@ -93,3 +93,11 @@ class ServiceTypeNotExist(RouteError):
     @classmethod
     def message(cls) -> str:
         return gettext("Invalid Service Type")
+
+
+class InvalidSnapshot(HketaException):
+    """The route data snapshot is corrupted or not supported"""
+
+    @classmethod
+    def message(cls) -> str:
+        return gettext("Invalid Snapshot")
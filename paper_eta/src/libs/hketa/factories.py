@@ -1,18 +1,34 @@
+import asyncio
+import logging
 import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Literal
 
 try:
+    from . import planner, snapshot
+    from .cache import LastGoodEtas
+    from .client import HttpClient
     from .enums import Company
     from .eta_processor import (BravoBusEta, EtaProcessor, KmbEta, MtrBusEta,
                                 MtrLrtEta, MtrTrainEta, NlbEta)
-    from .models import RouteQuery
+    from .models import Eta, RouteQuery
+    from .poller import EtaPoller
     from .route import Route
     from .transport import (CityBus, KowloonMotorBus, MTRBus, MTRLightRail,
                             MTRTrain, NewLantaoBus, Transport)
 except (ImportError, ModuleNotFoundError):
+    import planner
+    import snapshot
+    from cache import LastGoodEtas
+    from client import HttpClient
     from enums import Company
     from eta_processor import (BravoBusEta, EtaProcessor, KmbEta, MtrBusEta,
                                MtrLrtEta, MtrTrainEta, NlbEta)
-    from models import RouteQuery
+    from models import Eta, RouteQuery
+    from poller import EtaPoller
     from route import Route
     from transport import (CityBus, KowloonMotorBus, MTRBus, MTRLightRail,
                            MTRTrain, NewLantaoBus, Transport)
@@ -25,28 +41,59 @@ class EtaFactory:
     threshold: int
     """Expiry threshold of the local routes data file"""
 
+    storage: Literal["json", "sqlite"]
+    """Storage type of the local routes data"""
+
+    client: HttpClient
+    """Pooled HTTP client shared by all the ETA requests"""
+
+    eta_ttl: dict[Company, float]
+    """Seconds a fetched ETA response is considered fresh, by company"""
+
+    eta_stale: float
+    """Seconds after expiry that a stale ETA response is still served while it is revalidated"""
+
+    eta_deadline: float
+    """Seconds to wait for the ETAs of `etas_many`, the slower ones fall back to `last_good`"""
+
+    last_good: LastGoodEtas
+    """Last successfully fetched ETA of every route"""
+
+    poller: EtaPoller
+    """Background poller of the ETAs (not started by default)"""
+
     def __init__(self,
                  data_path: os.PathLike = None,
-                 threshold: int = 30) -> None:
+                 threshold: int = 30,
+                 storage: Literal["json", "sqlite"] = "json",
+                 eta_ttl: dict[Company, float] = None,
+                 eta_stale: float = 30,
+                 eta_deadline: float = 5,
+                 eta_fallback: float = 600,
+                 cache_size: int = 128) -> None:
         self.data_path = data_path
         self.threshold = threshold
+        self.storage = storage
+        self.eta_ttl = {company: 15 for company in Company} | (eta_ttl or {})
+        self.eta_stale = eta_stale
+        self.eta_deadline = eta_deadline
+        self.client = HttpClient(cache_size=cache_size)
+        self.last_good = LastGoodEtas(eta_fallback, cache_size)
+        self.poller = EtaPoller(self)
+        self._transports: dict[tuple, Transport] = {}
+        self._transports_lock = threading.Lock()
 
     def create_transport(self, transport_: Company) -> Transport:
-        match transport_:
-            case Company.KMB:
-                return KowloonMotorBus(self.data_path, self.threshold)
-            case Company.MTRBUS:
-                return MTRBus(self.data_path, self.threshold)
-            case Company.MTRLRT:
-                return MTRLightRail(self.data_path, self.threshold)
-            case Company.MTRTRAIN:
-                return MTRTrain(self.data_path, self.threshold)
-            case Company.CTB:
-                return CityBus(self.data_path, self.threshold)
-            case Company.NLB:
-                return NewLantaoBus(self.data_path, self.threshold)
-            case _:
-                raise ValueError(f"Unrecognized transport: {transport_}")
+        """Get the `Transport` of the company.
+
+        Instances are long-lived and shared by all callers (and threads), so
+        that the parsed route list is reused across requests.
+        """
+        key = (transport_, self.data_path, self.threshold, self.storage)
+        with self._transports_lock:
+            if (transport := self._transports.get(key)) is None:
+                transport = self._transports[key] = self._new_transport(transport_)
+        return transport
 
     def create_eta_processor(self, query: RouteQuery) -> EtaProcessor:
         route = self.create_route(query)
@@ -68,3 +115,145 @@ class EtaFactory:
 
     def create_route(self, query: RouteQuery) -> Route:
         return Route(query, self.create_transport(query.transport))
+
+    def etas_many(self, queries: Iterable[RouteQuery]) -> list[Eta]:
+        """Retrive the ETAs of multiple routes concurrently.
+
+        All requests are made within the event loop of the pooled `client`,
+        so the time taken is bounded by the slowest API instead of the sum of
+        them. Routes served by the same API call (e.g. routes at the same
+        stop) share it, see `planner.plan`. Responses younger than `eta_ttl`
+        are reused. ETAs are returned in the same order as `queries`.
+
+        ETAs that are failed to fetch or not fetched within `eta_deadline`
+        are replaced by the last good ones (with `Eta.is_stale` set) if any.
+
+        When the `poller` is running, ETAs on its board are returned without
+        fetching.
+        """
+        queries = list(queries)
+        etas = [self.poller.get(q) if self.poller.is_running else None for q in queries]
+        if (missing := [i for i, eta in enumerate(etas) if eta is None]):
+            fetched = self.client.run(self.gather_etas(
+                [self.create_eta_processor(queries[i]) for i in missing]))
+            for i, eta in zip(missing, fetched):
+                etas[i] = eta
+        return etas
+
+    async def gather_etas(self, processors: Iterable[EtaProcessor]) -> list[Eta]:
+        """Coroutine of `etas_many` (without the `poller`), must be awaited
+        within the event loop of `client`.
+        """
+        processors = list(processors)
+        requests = planner.plan(
+            processors,
+            lambda request, p: 0 if self.client.is_fresh(request, self._eta_ttl(p)) else 1)
+        tasks = [asyncio.ensure_future(
+                     p.aetas(self.client, self._eta_ttl(p), self.eta_stale, request))
+                 for p, request in zip(processors, requests)]
+        try:
+            if len(tasks) > 0:
+                await asyncio.wait(tasks, timeout=self.eta_deadline or None)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        etas = []
+        for processor, task in zip(processors, tasks):
+            key = processor.route.entry.key()
+            if not task.done():
+                # the request itself is kept (shielded by the client) for the next fetch
+                task.cancel()
+                logging.warning("%s is not fetched within %ss.",
+                                processor.__class__.__name__, self.eta_deadline)
+            elif task.exception() is not None:
+                logging.warning("%s failed: %r", processor.__class__.__name__, task.exception())
+            elif not (isinstance(task.result().etas, Eta.Error)
+                      and task.result().etas.code == "api-error"):
+                self.last_good.put(key, task.result())
+                etas.append(task.result())
+                continue
+
+            etas.append(self.last_good.get(key) or processor.error("api-error"))
+        return etas
+
+    def refresh_status(self) -> dict[Company, dict]:
+        """Get the status of the route list refresh jobs of every company."""
+        return {company: self.create_transport(company).refresh_job.status()
+                for company in Company}
+
+    def export_snapshot(self, fpath: os.PathLike) -> dict[str, Any]:
+        """Export the route data of all companies to a snapshot file.
+
+        Returns the header of the snapshot.
+        """
+        return snapshot.export(
+            {company: self.create_transport(company).storage for company in Company}, fpath)
+
+    def import_snapshot(self, fpath: os.PathLike) -> dict[str, Any]:
+        """Replace the route data of all companies by a snapshot file.
+
+        The snapshot is verified and restored to a staging directory before
+        it is swapped with `data_path`, the route data are either fully
+        replaced or left untouched.
+
+        Returns the header of the snapshot.
+
+        Raises:
+            InvalidSnapshot: the file is corrupted, or is not a (supported) snapshot
+        """
+        header, data = snapshot.read(fpath)
+
+        root = Path(str(self.data_path))
+        os.makedirs(root.parent, exist_ok=True)
+        # a new directory on every import, `Transport`s (and their storages)
+        # are shared process-wide by data directory
+        staging = Path(tempfile.mkdtemp(prefix=f".{root.name}.", dir=root.parent))
+        staging_factory = EtaFactory(staging, self.threshold, self.storage)
+        try:
+            for company, company_data in data.items():
+                snapshot.restore(company_data, staging_factory.create_transport(company).storage)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        finally:
+            staging_factory.close()
+            Transport.discard(staging)
+
+        logging.info("Replacing route data in %s by snapshot %s...", root, fpath)
+        backup = root.with_name(f".{root.name}.old")
+        shutil.rmtree(backup, ignore_errors=True)
+        if root.exists():
+            os.replace(root, backup)
+        os.replace(staging, root)
+        shutil.rmtree(backup, ignore_errors=True)
+
+        for company in Company:
+            self.create_transport(company).reload()
+        return header
+
+    def close(self) -> None:
+        """Release the resources (e.g. HTTP connections) held by the factory."""
+        self.poller.stop()
+        self.client.close()
+
+    def _new_transport(self, transport_: Company) -> Transport:
+        match transport_:
+            case Company.KMB:
+                return KowloonMotorBus(self.data_path, self.threshold, self.storage)
+            case Company.MTRBUS:
+                return MTRBus(self.data_path, self.threshold, self.storage)
+            case Company.MTRLRT:
+                return MTRLightRail(self.data_path, self.threshold, self.storage)
+            case Company.MTRTRAIN:
+                return MTRTrain(self.data_path, self.threshold, self.storage)
+            case Company.CTB:
+                return CityBus(self.data_path, self.threshold, self.storage)
+            case Company.NLB:
+                return NewLantaoBus(self.data_path, self.threshold, self.storage)
+            case _:
+                raise ValueError(f"Unrecognized transport: {transport_}")
+
+    def _eta_ttl(self, processor: EtaProcessor) -> float:
+        return self.eta_ttl.get(processor.route.entry.transport, 0)
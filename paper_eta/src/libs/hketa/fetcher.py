@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from pathlib import Path
+from typing import (Any, Awaitable, Callable, Hashable, Iterable, Optional,
+                    Protocol, TypeVar)
+
+import aiohttp
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Progress(Protocol):
+
+    def add_total(self, count: int) -> None: ...
+
+    def advance(self, count: int = 1) -> None: ...
+
+
+class FetchEngine:
+    """
+    Route Data Fetch Engine
+    ~~~~~~~~~~~~~~~~~~~~~
+    `FetchEngine` makes the (large amount of) API calls for building the route
+    data of a `Transport` in a predictable manner:
+
+    - at most `concurrency` requests are in flight at the same time
+    - requests to the same host are limited to `rate` per second
+    - failed requests are retried `retries` times with jittered exponential backoff
+    - results of `map` are checkpointed, so a failed build resumes from where it stopped
+
+    ---
+    Usage:
+
+        async with FetchEngine() as engine:
+            routes = await engine.fetch(api.kmb_route_list)
+    """
+
+    concurrency: int
+    """Maximum number of requests in flight"""
+    rate: float
+    """Maximum number of requests per second to the same host"""
+    retries: int
+    """Number of retries of a failed request"""
+    backoff: float
+    """Base seconds to wait before retrying a failed request"""
+    timeout: float
+    """Seconds before a request is timed out"""
+    checkpoint: Optional[Path]
+    """Path to the checkpoint file of `map`, `None` to disable checkpointing"""
+    checkpoint_age: float
+    """Seconds before a checkpoint is too old to be resumed from"""
+    progress: Optional[Progress]
+    """Receiver of the progress of `map`"""
+
+    def __init__(self,
+                 concurrency: int = 8,
+                 rate: float = 10,
+                 retries: int = 3,
+                 backoff: float = 1,
+                 timeout: float = 30,
+                 checkpoint: Optional[os.PathLike] = None,
+                 checkpoint_age: float = 86400,
+                 progress: Optional[Progress] = None) -> None:
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.checkpoint = None if checkpoint is None else Path(str(checkpoint))
+        self.checkpoint_age = checkpoint_age
+        self.progress = progress
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._next_slots: dict[str, float] = {}
+
+    async def __aenter__(self) -> "FetchEngine":
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace])
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb) -> None:
+        await self._session.close()
+        self._session = None
+
+    async def fetch(self, func: Callable[..., Awaitable[R]], *args: Any) -> R:
+        """Call the API function `func` with `args`, retrying on failure.
+
+        Raises:
+            aiohttp.ClientError: the request is still failed after all the retries
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    return await func(*args, session=self._session)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries or not self._is_retryable(e):
+                    raise
+                # "full jitter" exponential backoff
+                delay = random.uniform(0, self.backoff * 2 ** attempt)
+                logging.warning("%s%s failed (%s), retry in %.1fs...",
+                                func.__name__, args, e.__class__.__name__, delay)
+                await asyncio.sleep(delay)
+
+    async def map(self,
+                  func: Callable[[T], Awaitable[R]],
+                  items: Iterable[T],
+                  key: Optional[Callable[[T], Hashable]] = None) -> list[R]:
+        """Apply `func` to every item concurrently, results are in the same
+        order as `items`.
+
+        When both `checkpoint` and `key` are set, the result of each item is
+        saved as soon as it is finished (results must be JSON serialisable),
+        and the items finished by a previous (failed) call within
+        `checkpoint_age` are skipped.
+        The checkpoint is removed after all the items are finished.
+        """
+        items = list(items)
+        checkpointing = self.checkpoint is not None and key is not None
+        done = self._load_checkpoint() if checkpointing else {}
+
+        if self.progress is not None:
+            self.progress.add_total(len(items))
+            self.progress.advance(sum(str(key(i)) in done for i in items)
+                                  if checkpointing else 0)
+
+        async def run(item: T) -> R:
+            if checkpointing and (k := str(key(item))) in done:
+                return done[k]
+
+            result = await func(item)
+            if checkpointing:
+                self._save_checkpoint(k, result)
+            if self.progress is not None:
+                self.progress.advance()
+            return result
+
+        tasks = [asyncio.ensure_future(run(item)) for item in items]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # stop the remaining items, the finished ones are checkpointed
+            for task in tasks:
+                task.cancel()
+            raise
+        if checkpointing:
+            self.checkpoint.unlink(missing_ok=True)
+        return results
+
+    async def _on_request_start(self, _session, _context, params) -> None:
+        # spread the requests to the same host according to the `rate`
+        host = params.url.host
+        now = time.monotonic()
+        slot = max(now, self._next_slots.get(host, now))
+        self._next_slots[host] = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status == 429 or error.status >= 500
+        return True
+
+    def _load_checkpoint(self) -> dict[str, Any]:
+        done = {}
+        try:
+            if time.time() - os.stat(self.checkpoint).st_mtime > self.checkpoint_age:
+                logging.info("Discarding outdated checkpoint %s.", self.checkpoint)
+                self.checkpoint.unlink()
+                return done
+
+            with open(self.checkpoint, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # partially written line
+                    done[record['key']] = record['result']
+        except FileNotFoundError:
+            return done
+
+        logging.info("Resuming from checkpoint %s (%d finished).",
+                     self.checkpoint, len(done))
+        return done
+
+    def _save_checkpoint(self, key: str, result: Any) -> None:
+        if not self.checkpoint.parent.exists():
+            os.makedirs(self.checkpoint.parent)
+        with open(self.checkpoint, "a", encoding="utf-8") as f:
+            f.write(json.dumps({'key': key, 'result': result}) + "\n")
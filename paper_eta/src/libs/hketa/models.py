@@ -22,6 +22,10 @@ class RouteQuery(pydantic.BaseModel):
     service_type: str
     locale: enums.Locale
 
+    def key(self) -> tuple:
+        """Get the (hashable) identity of the query."""
+        return tuple(self.model_dump().values())
+
 
 class RouteInfo(TypedDict):
 
@@ -36,6 +40,8 @@ class RouteInfo(TypedDict):
         route_id: Optional[str] = None
         orig: Optional["RouteInfo.Stop"] = None
         dest: Optional["RouteInfo.Stop"] = None
+        digest: Optional[str] = None
+        """Hash of the route list entry that the bound is built from (for delta sync)"""
 
     class Stop(TypedDict):
 
@@ -56,6 +62,9 @@ class Eta(pydantic.BaseModel):
     etas: Union[list["Time"], "Error"]
     timestamp: datetime = pydantic.Field(
         default=datetime.now().replace(tzinfo=pytz.timezone('Etc/GMT-8')))
+    is_stale: bool = False
+    """Indicate whether the ETAs are from an earlier fetch since the latest one was failed.
+    """
 
     class Time(pydantic.BaseModel):
         destination: str
@@ -71,3 +80,5 @@ class Eta(pydantic.BaseModel):
 
     class Error(pydantic.BaseModel):
         message: str
+        code: Optional[str] = None
+        """Type of the error (e.g. "api-error", "eos"), `None` for errors from the API"""
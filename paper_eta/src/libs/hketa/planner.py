@@ -0,0 +1,57 @@
+import functools
+import logging
+from typing import Callable, Hashable, Iterable, Optional
+
+try:
+    from .client import request_key
+    from .eta_processor import EtaProcessor
+except (ImportError, ModuleNotFoundError):
+    from client import request_key
+    from eta_processor import EtaProcessor
+
+Cost = Callable[[functools.partial, EtaProcessor], float]
+"""Cost of making an API call (for the given processor), e.g. `0` if it is cached"""
+
+
+def plan(processors: Iterable[EtaProcessor],
+         cost: Optional[Cost] = None) -> list[functools.partial]:
+    """Choose the API call of every processor, so that all the processors are
+    served by the cheapest set of calls.
+
+    Each processor can be served by any of its `EtaProcessor.requests`,
+    and a call shared by several processors (e.g. ETAs of all routes at a
+    stop) is only made once. The calls are picked greedily by their cost
+    per processor served (i.e. weighted set cover), ties are broken by the
+    preference of the processors.
+
+    Returns the API calls in the same order as `processors`.
+    """
+    processors = list(processors)
+    cost = cost or (lambda request, processor: 1)
+
+    # candidate calls by identity: the call, processors it serves (with the preference)
+    candidates: dict[Hashable, tuple[functools.partial, dict[int, int]]] = {}
+    for idx, processor in enumerate(processors):
+        for rank, request in enumerate(processor.requests()):
+            candidates.setdefault(request_key(request), (request, {}))[1] \
+                .setdefault(idx, rank)
+
+    costs = {key: cost(request, processors[next(iter(served))])
+             for key, (request, served) in candidates.items()}
+
+    assignments: list[Optional[functools.partial]] = [None] * len(processors)
+    while (uncovered := {i for i, a in enumerate(assignments) if a is None}):
+        def score(key: Hashable) -> tuple[float, int]:
+            served = candidates[key][1].keys() & uncovered
+            if not served:
+                return (float("inf"), 0)
+            return (costs[key] / len(served), sum(candidates[key][1][i] for i in served))
+
+        best = min(candidates, key=score)
+        request, served = candidates.pop(best)
+        for idx in served.keys() & uncovered:
+            assignments[idx] = request
+
+    logging.debug("Planned %d API call(s) for %d ETA(s).",
+                  len({request_key(a) for a in assignments}), len(processors))
+    return assignments
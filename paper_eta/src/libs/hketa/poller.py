@@ -0,0 +1,157 @@
+import asyncio
+import concurrent.futures
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable, Optional
+
+try:
+    from .enums import Company
+    from .eta_processor import EtaProcessor
+    from .exceptions import HketaException
+    from .models import Eta, RouteQuery
+except (ImportError, ModuleNotFoundError):
+    from enums import Company
+    from eta_processor import EtaProcessor
+    from exceptions import HketaException
+    from models import Eta, RouteQuery
+
+if TYPE_CHECKING:
+    try:
+        from .factories import EtaFactory
+    except (ImportError, ModuleNotFoundError):
+        from factories import EtaFactory
+
+
+class EtaPoller:
+    """
+    Background ETA Poller
+    ~~~~~~~~~~~~~~~~~~~~~
+    `EtaPoller` keeps a board of the latest ETAs of the watched queries,
+    polling the queries of each company every `interval` seconds on the
+    event loop of the factory's `HttpClient`.
+
+    ---
+    Readers get the ETAs from the board without waiting for the network,
+    and the upstream load does not grow with the number of readers.
+
+    The watched queries are either set by `watch`, or loaded from `source`
+    every `source_interval` seconds.
+    """
+
+    interval: dict[Company, float]
+    """Seconds between polls of the ETAs, by company"""
+    source: Optional[Callable[[], Iterable[RouteQuery]]]
+    """Loader of the queries to be watched (called in a worker thread)"""
+    source_interval: float
+    """Seconds between loads of the watched queries from `source`"""
+
+    def __init__(self,
+                 factory: "EtaFactory",
+                 interval: dict[Company, float] = None,
+                 source: Optional[Callable[[], Iterable[RouteQuery]]] = None,
+                 source_interval: float = 30) -> None:
+        self.interval = {company: 15 for company in Company} | (interval or {})
+        self.source = source
+        self.source_interval = source_interval
+
+        self._factory = factory
+        self._queries: dict[Hashable, RouteQuery] = {}
+        self._board: dict[Hashable, tuple[Eta, float]] = {}
+        self._future: Optional[concurrent.futures.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def start(self) -> None:
+        """Start polling in the background (no-op if it is running)."""
+        if self.is_running:
+            return
+        logging.info("Starting ETA poller.")
+        self._future = self._factory.client.submit(self._run())
+
+    def stop(self) -> None:
+        """Stop polling and wait for the running polls to be cancelled."""
+        if self.is_running:
+            self._factory.client.run(self._cancel())
+            self._future.cancel()  # in case it is not started yet
+        self._future = self._task = None
+
+    def watch(self, queries: Iterable[RouteQuery]) -> None:
+        """Replace the watched queries, the ETAs of the others are removed from the board."""
+        queries = {q.key(): q for q in queries}
+        self._queries = queries
+        for key in self._board.keys() - queries.keys():
+            self._board.pop(key, None)
+
+    def get(self, query: RouteQuery) -> Optional[Eta]:
+        """Get the ETA of `query` from the board, `None` if it is not watched
+        or it is not polled recently (e.g. the upstream is not responding).
+        """
+        if (entry := self._board.get(query.key())) is None:
+            return None
+        eta, polled_at = entry
+        if time.monotonic() - polled_at > 3 * self.interval.get(query.transport, 15):
+            return None
+        return eta
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        loaded_at = float("-inf")
+        next_polls: dict[Company, float] = {}
+        polls: dict[Company, asyncio.Task] = {}
+
+        self._task = asyncio.current_task()
+        try:
+            while True:
+                now = time.monotonic()
+                if self.source is not None and now - loaded_at >= self.source_interval:
+                    try:
+                        self.watch(await loop.run_in_executor(None, lambda: list(self.source())))
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        logging.exception("Failed to load the queries to be polled.")
+                    loaded_at = now
+
+                for company in Company:
+                    if (now < next_polls.get(company, now)
+                            or (company in polls and not polls[company].done())):
+                        continue
+                    queries = [q for q in self._queries.values() if q.transport == company]
+                    if len(queries) > 0:
+                        polls[company] = asyncio.create_task(self._poll(queries))
+                    next_polls[company] = now + self.interval.get(company, 15)
+
+                await asyncio.sleep(1)
+        finally:
+            for task in polls.values():
+                task.cancel()
+            await asyncio.gather(*polls.values(), return_exceptions=True)
+
+    async def _cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait([self._task])
+
+    async def _poll(self, queries: list[RouteQuery]) -> None:
+        loop = asyncio.get_running_loop()
+        processors = await loop.run_in_executor(None, self._create_processors, queries)
+        try:
+            etas = await self._factory.gather_etas(processors)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logging.exception("Failed to poll the ETAs.")
+            return
+
+        polled_at = time.monotonic()
+        for processor, eta in zip(processors, etas):
+            if (key := processor.route.entry.key()) in self._queries:
+                self._board[key] = (eta, polled_at)
+
+    def _create_processors(self, queries: list[RouteQuery]) -> list[EtaProcessor]:
+        processors = []
+        for query in queries:
+            try:
+                processors.append(self._factory.create_eta_processor(query))
+            except HketaException as e:
+                logging.warning("Unable to poll %s: %r", query, e)
+        return processors
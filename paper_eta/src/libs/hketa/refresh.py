@@ -0,0 +1,114 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Literal, Optional
+
+
+class RefreshJob:
+    """
+    Background Refresh Job
+    ~~~~~~~~~~~~~~~~~~~~~
+    `RefreshJob` runs a (long running) data rebuild in a background thread,
+    at most one at a time, and keeps track of its progress.
+
+    ---
+    The job is reusable, it can be started again after it is finished, or
+    `cooldown` seconds after it is failed.
+    """
+
+    name: str
+    cooldown: float
+    """Seconds to wait before the job can be started again after a failure"""
+    state: Literal["idle", "running", "succeeded", "failed"]
+    done: int
+    """Number of finished steps of the running job"""
+    total: int
+    """Number of steps of the running job, `0` if unknown"""
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
+    generation: int
+    """Number of succeeded runs"""
+
+    def __init__(self, name: str, cooldown: float = 600) -> None:
+        self.name = name
+        self.cooldown = cooldown
+        self.state = "idle"
+        self.done = self.total = 0
+        self.started_at = self.finished_at = None
+        self.error = None
+        self.generation = 0
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.state == "running"
+
+    def start(self, target: Callable[[], Any], force: bool = False) -> bool:
+        """Run `target` in a background thread.
+
+        Returns `False` if the job is already running or is cooling down from
+        a failure (unless `force`).
+        """
+        with self._lock:
+            if self.is_running:
+                return False
+            if (not force
+                    and self.state == "failed"
+                    and (datetime.now() - self.finished_at).total_seconds() < self.cooldown):
+                return False
+
+            self.state = "running"
+            self.done = self.total = 0
+            self.started_at = datetime.now()
+            self.finished_at = self.error = None
+            self._thread = threading.Thread(target=self._run,
+                                            args=(target,),
+                                            name=f"refresh-{self.name}",
+                                            daemon=True)
+            self._thread.start()
+            return True
+
+    def run(self, target: Callable[[], Any]) -> None:
+        """Run `target` (or wait for the running one) in the foreground."""
+        self.start(target, force=True)
+        self.join()
+        if self.state == "failed":
+            raise RuntimeError(f"Failed to refresh {self.name}: {self.error}")
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if (thread := self._thread) is not None:
+            thread.join(timeout)
+
+    def add_total(self, count: int) -> None:
+        with self._lock:
+            self.total += count
+
+    def advance(self, count: int = 1) -> None:
+        with self._lock:
+            self.done += count
+
+    def status(self) -> dict[str, Any]:
+        return {
+            'state': self.state,
+            'done': self.done,
+            'total': self.total,
+            'started_at': self.started_at and self.started_at.isoformat(timespec="seconds"),
+            'finished_at': self.finished_at and self.finished_at.isoformat(timespec="seconds"),
+            'error': self.error,
+        }
+
+    def _run(self, target: Callable[[], Any]) -> None:
+        try:
+            target()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.exception("Failed to refresh %s.", self.name)
+            self.error = str(e) or e.__class__.__name__
+            self.finished_at = datetime.now()
+            self.state = "failed"
+        else:
+            self.generation += 1
+            self.finished_at = datetime.now()
+            self.state = "succeeded"
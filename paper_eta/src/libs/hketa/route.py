@@ -46,10 +46,8 @@ class Route:
     def __init__(self, entry: RouteQuery, transport_: Transport) -> None:
         self.entry = entry
         self.provider = transport_
-        self._stop_list = {
-            stop["id"]: stop
-            for stop in self.provider.stop_list(entry.no, entry.direction, entry.service_type)
-        }
+        self._stop_list = self.provider.stop_index(
+            entry.no, entry.direction, entry.service_type)
 
         if (self.entry.stop_id not in self._stop_list.keys()):
             raise StopNotExist(self.entry.stop_id)
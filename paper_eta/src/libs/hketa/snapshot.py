@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Mapping
+
+try:
+    from .enums import Company, Direction
+    from .exceptions import InvalidSnapshot
+    from .storage import Storage
+except (ImportError, ModuleNotFoundError):
+    from enums import Company, Direction
+    from exceptions import InvalidSnapshot
+    from storage import Storage
+
+FORMAT = "hketa-snapshot"
+VERSION = 1
+"""Version of the snapshot layout, bumped on incompatible changes"""
+
+
+def export(storages: Mapping[Company, Storage], fpath: os.PathLike) -> dict[str, Any]:
+    """Write the route data of `storages` to a snapshot file at `fpath`.
+
+    A snapshot is a gzip file of two JSON lines: the header (format, version,
+    checksum, etc.) and the data of every company. The checksum is the
+    SHA-256 of the data line.
+
+    Returns the header of the snapshot.
+    """
+    data = {}
+    for company, storage in storages.items():
+        if (routes := storage.load_routes()) is None:
+            logging.warning("No route data of %s, skipped.", company.value)
+            continue
+        data[company.value] = {
+            'routes': routes,
+            'stop_lists': [
+                {'route_no': no,
+                 'direction': direction.value,
+                 'service_type': service_type,
+                 'data': storage.load_stops(no, direction, service_type)}
+                for no, direction, service_type in storage.stop_lists()
+            ],
+            'stop_details': storage.load_stop_details(),
+            'validators': storage.load_validators(),
+        }
+
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    header = {
+        'format': FORMAT,
+        'version': VERSION,
+        'created_at': datetime.now().isoformat(timespec="seconds"),
+        'companies': list(data.keys()),
+        'sha256': hashlib.sha256(body).hexdigest(),
+    }
+
+    fpath = Path(str(fpath))
+    tmp = fpath.with_name(f".{fpath.name}.tmp")
+    with gzip.open(tmp, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(body)
+    os.replace(tmp, fpath)
+    return header
+
+
+def read(fpath: os.PathLike) -> tuple[dict[str, Any], dict[Company, dict]]:
+    """Read and verify the snapshot file at `fpath`.
+
+    Returns the header and the data (by company) of the snapshot.
+
+    Raises:
+        InvalidSnapshot: the file is corrupted, or is not a (supported) snapshot
+    """
+    try:
+        with gzip.open(fpath, "rb") as f:
+            header = json.loads(f.readline())
+            body = f.read()
+    except (OSError, EOFError, ValueError) as e:
+        raise InvalidSnapshot(f"Unreadable snapshot: {e}") from e
+
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise InvalidSnapshot("Not a route data snapshot.")
+    if header.get('version') != VERSION:
+        raise InvalidSnapshot(f"Unsupported snapshot version: {header.get('version')}")
+    if hashlib.sha256(body).hexdigest() != header.get('sha256'):
+        raise InvalidSnapshot("Checksum mismatch, the snapshot is corrupted.")
+
+    try:
+        data = {Company(c): d for c, d in json.loads(body).items()}
+    except ValueError as e:
+        raise InvalidSnapshot(f"Malformed snapshot: {e}") from e
+    return header, data
+
+
+def restore(data: dict, storage: Storage) -> None:
+    """Replace the route data in `storage` by the `data` of a company in a snapshot."""
+    storage.replace(
+        data['routes'],
+        {(s['route_no'], Direction(s['direction']), s['service_type']): s['data']
+         for s in data['stop_lists']})
+    if data.get('stop_details') is not None:
+        storage.save_stop_details(data['stop_details'])
+    if data.get('validators') is not None:
+        storage.save_validators(data['validators'])
@@ -0,0 +1,499 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import Hashable, Iterable, Optional
+
+try:
+    from .enums import Company, Direction
+except (ImportError, ModuleNotFoundError):
+    from enums import Company, Direction
+
+StopListKey = tuple[str, Direction, str]
+"""(route number, direction, service type)"""
+
+
+def stop_list_fname(no: str,
+                    direction: Direction,
+                    service_type: str) -> str:
+    """Get the file name of the stop list file.
+    """
+    return f"{no.upper()}-{direction.value.lower()}-{service_type.lower()}.json"
+
+
+def _put_data_file(path: os.PathLike, data) -> None:
+    """Write `data` to local file system encoded in JSON format.
+
+    The file is replaced atomically, readers never see a partially written file.
+    """
+    path = Path(str(path))
+    if not path.parent.exists():
+        os.makedirs(path.parent)
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class Storage(ABC):
+    """
+        Route Data Storage
+        ~~~~~~~~~~~~~~~~~~~~~
+        `Storage` persists the route list and stop lists of a `Transport`.
+
+        ---
+        Both are stored in the form of `{'last_update': <ISO-8601>, 'data': ...}`
+    """
+
+    @abstractmethod
+    def load_routes(self) -> Optional[dict]:
+        """Load the route list, `None` if it is not stored."""
+
+    @abstractmethod
+    def save_routes(self, data: dict) -> None:
+        """Store the route list."""
+
+    @abstractmethod
+    def routes_stamp(self) -> Optional[Hashable]:
+        """Get a token that changes whenever the route list is written,
+        `None` if it is not stored.
+        """
+
+    @abstractmethod
+    def stamp(self,
+              route_no: str,
+              direction: Direction,
+              service_type: str) -> Optional[Hashable]:
+        """Get a token that changes whenever the stop list is written,
+        `None` if it is not stored.
+        """
+
+    @abstractmethod
+    def load_stops(self,
+                   route_no: str,
+                   direction: Direction,
+                   service_type: str) -> Optional[dict]:
+        """Load the stop list of a route, `None` if it is not stored."""
+
+    @abstractmethod
+    def save_stops(self,
+                   route_no: str,
+                   direction: Direction,
+                   service_type: str,
+                   data: dict) -> None:
+        """Store the stop list of a route."""
+
+    @abstractmethod
+    def delete_stops(self,
+                     route_no: str,
+                     direction: Direction,
+                     service_type: str) -> None:
+        """Remove the stored stop list of a route (if any)."""
+
+    @abstractmethod
+    def stop_lists(self) -> Iterable[StopListKey]:
+        """Get the keys of all the stored stop lists."""
+
+    @abstractmethod
+    def replace(self, routes: dict, stop_lists: dict[StopListKey, dict]) -> None:
+        """Replace all the stored data atomically."""
+
+    @abstractmethod
+    def load_stop_details(self) -> Optional[dict]:
+        """Load the details of the stops (by stop ID), `None` if it is not stored."""
+
+    @abstractmethod
+    def save_stop_details(self, data: dict) -> None:
+        """Store the details of the stops (by stop ID)."""
+
+    @abstractmethod
+    def touch(self, last_update: str, stop_lists: bool = False) -> None:
+        """Set the last update time of the route list (and all the stop lists)
+        without rewriting the data.
+        """
+
+    @abstractmethod
+    def load_validators(self) -> Optional[dict]:
+        """Load the HTTP validators (by dataset URL) of the data, `None` if it is not stored."""
+
+    @abstractmethod
+    def save_validators(self, data: dict) -> None:
+        """Store the HTTP validators (by dataset URL) of the data."""
+
+    def copy_from(self, other: "Storage") -> None:
+        """Replace all the stored data by the data of `other`."""
+        self.replace(other.load_routes(),
+                     {key: other.load_stops(*key) for key in other.stop_lists()})
+        if (details := other.load_stop_details()) is not None:
+            self.save_stop_details(details)
+        if (validators := other.load_validators()) is not None:
+            self.save_validators(validators)
+
+
+class JsonStorage(Storage):
+    """Stores the route list in `routes.json` and every stop list in its own
+    file under `routes/`.
+    """
+
+    @property
+    def route_list_path(self) -> Path:
+        return self._root.joinpath('routes.json')
+
+    @property
+    def stops_list_dir(self) -> Path:
+        return self._root.joinpath('routes')
+
+    @property
+    def stop_details_path(self) -> Path:
+        return self._root.joinpath('stops.json')
+
+    @property
+    def validators_path(self) -> Path:
+        return self._root.joinpath('validators.json')
+
+    def __init__(self, root: os.PathLike) -> None:
+        self._root = Path(str(root))
+
+    def load_routes(self):
+        try:
+            with open(self.route_list_path, 'r', encoding='UTF-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, PermissionError):
+            return None
+
+    def save_routes(self, data):
+        _put_data_file(self.route_list_path, data)
+
+    def routes_stamp(self):
+        try:
+            return os.stat(self.route_list_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def stamp(self, route_no, direction, service_type):
+        try:
+            return os.stat(self._stops_path(route_no, direction, service_type)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load_stops(self, route_no, direction, service_type):
+        try:
+            with open(self._stops_path(route_no, direction, service_type),
+                      'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_stops(self, route_no, direction, service_type, data):
+        _put_data_file(self._stops_path(route_no, direction, service_type), data)
+
+    def delete_stops(self, route_no, direction, service_type):
+        self._stops_path(route_no, direction, service_type).unlink(missing_ok=True)
+
+    def stop_lists(self):
+        for fpath in self.stops_list_dir.glob("*.json"):
+            # route number could contain "-" (e.g. EAL-LMC)
+            no, direction, service_type = fpath.stem.rsplit("-", 2)
+            yield (no, Direction(direction), service_type)
+
+    def replace(self, routes, stop_lists):
+        staging = self._root.joinpath('.staging')
+        shutil.rmtree(staging, ignore_errors=True)
+
+        for (no, direction, service_type), data in stop_lists.items():
+            _put_data_file(staging.joinpath(
+                'routes', stop_list_fname(no, direction, service_type)), data)
+        os.makedirs(staging.joinpath('routes'), exist_ok=True)
+
+        # swap the directory first, route list is the "commit"
+        backup = self._root.joinpath('.routes.old')
+        shutil.rmtree(backup, ignore_errors=True)
+        if self.stops_list_dir.exists():
+            os.replace(self.stops_list_dir, backup)
+        os.replace(staging.joinpath('routes'), self.stops_list_dir)
+        self.save_routes(routes)
+
+        shutil.rmtree(backup, ignore_errors=True)
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def load_stop_details(self):
+        try:
+            with open(self.stop_details_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_stop_details(self, data):
+        _put_data_file(self.stop_details_path, data)
+
+    def touch(self, last_update, stop_lists=False):
+        paths = [self.route_list_path]
+        if stop_lists:
+            paths.extend(self.stops_list_dir.glob("*.json"))
+
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _put_data_file(path, data | {'last_update': last_update})
+
+    def load_validators(self):
+        try:
+            with open(self.validators_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_validators(self, data):
+        _put_data_file(self.validators_path, data)
+
+    def _stops_path(self, route_no: str, direction: Direction, service_type: str) -> Path:
+        return self.stops_list_dir.joinpath(stop_list_fname(route_no, direction, service_type))
+
+
+class SqliteStorage(Storage):
+    """Stores the data of all companies in a single SQLite database,
+    with stops indexed by route and by stop ID.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS route_lists (
+            company TEXT PRIMARY KEY,
+            last_update TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS routes (
+            company TEXT NOT NULL,
+            route_no TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (company, route_no)
+        );
+        CREATE TABLE IF NOT EXISTS stop_lists (
+            company TEXT NOT NULL,
+            route_no TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            last_update TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (company, route_no, direction, service_type)
+        );
+        CREATE TABLE IF NOT EXISTS stops (
+            company TEXT NOT NULL,
+            route_no TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            stop_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (company, route_no, direction, service_type, position)
+        );
+        CREATE INDEX IF NOT EXISTS stops_stop_id ON stops (company, stop_id);
+        CREATE TABLE IF NOT EXISTS stop_details (
+            company TEXT NOT NULL,
+            stop_id TEXT NOT NULL,
+            last_update TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (company, stop_id)
+        );
+        CREATE TABLE IF NOT EXISTS validators (
+            company TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    _init_lock = threading.Lock()
+
+    def __init__(self, path: os.PathLike, company: Company) -> None:
+        self.path = Path(str(path))
+        self.company = company
+
+        with SqliteStorage._init_lock:
+            if not self.path.parent.exists():
+                os.makedirs(self.path.parent)
+            with closing(self._connect()) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(self._schema)
+
+    def load_routes(self):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT last_update FROM route_lists WHERE company = ?",
+                               (self.company.value,)).fetchone()
+            if row is None:
+                return None
+            return {
+                'last_update': row[0],
+                'data': {
+                    no: json.loads(data) for no, data in conn.execute(
+                        "SELECT route_no, data FROM routes WHERE company = ?",
+                        (self.company.value,))
+                }
+            }
+
+    def save_routes(self, data):
+        with closing(self._connect()) as conn:
+            with conn:
+                self._write_routes(conn, data)
+
+    def routes_stamp(self):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT version FROM route_lists WHERE company = ?",
+                               (self.company.value,)).fetchone()
+        return None if row is None else row[0]
+
+    def stamp(self, route_no, direction, service_type):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT version FROM stop_lists"
+                " WHERE company = ? AND route_no = ? AND direction = ? AND service_type = ?",
+                (self.company.value, route_no, direction.value, service_type)).fetchone()
+        return None if row is None else row[0]
+
+    def load_stops(self, route_no, direction, service_type):
+        key = (self.company.value, route_no, direction.value, service_type)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT last_update FROM stop_lists"
+                " WHERE company = ? AND route_no = ? AND direction = ? AND service_type = ?",
+                key).fetchone()
+            if row is None:
+                return None
+            return {
+                'last_update': row[0],
+                'data': [json.loads(data) for (data, ) in conn.execute(
+                    "SELECT data FROM stops"
+                    " WHERE company = ? AND route_no = ? AND direction = ? AND service_type = ?"
+                    " ORDER BY position", key)]
+            }
+
+    def save_stops(self, route_no, direction, service_type, data):
+        with closing(self._connect()) as conn:
+            with conn:
+                self._write_stops(conn, (route_no, direction, service_type), data)
+
+    def delete_stops(self, route_no, direction, service_type):
+        key = (self.company.value, route_no, direction.value, service_type)
+        with closing(self._connect()) as conn:
+            with conn:
+                for table in ('stops', 'stop_lists'):
+                    conn.execute(f"DELETE FROM {table} WHERE company = ? AND route_no = ?"
+                                 " AND direction = ? AND service_type = ?", key)
+
+    def stop_lists(self):
+        with closing(self._connect()) as conn:
+            return [(no, Direction(direction), service_type)
+                    for no, direction, service_type in conn.execute(
+                        "SELECT route_no, direction, service_type FROM stop_lists"
+                        " WHERE company = ?", (self.company.value,))]
+
+    def replace(self, routes, stop_lists):
+        with closing(self._connect()) as conn:
+            with conn:
+                for table in ('stops', 'stop_lists'):
+                    conn.execute(f"DELETE FROM {table} WHERE company = ?",
+                                 (self.company.value,))
+                self._write_routes(conn, routes)
+                for key, data in stop_lists.items():
+                    self._write_stops(conn, key, data)
+
+    def load_stop_details(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT stop_id, last_update, data FROM stop_details"
+                                " WHERE company = ?", (self.company.value,)).fetchall()
+        if len(rows) == 0:
+            return None
+        return {
+            'last_update': min(row[1] for row in rows),
+            'data': {stop_id: json.loads(data) for stop_id, _, data in rows}
+        }
+
+    def save_stop_details(self, data):
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM stop_details WHERE company = ?", (self.company.value,))
+                conn.executemany("INSERT INTO stop_details (company, stop_id, last_update, data)"
+                                 " VALUES (?, ?, ?, ?)",
+                                 ((self.company.value, stop_id, data['last_update'],
+                                   json.dumps(details))
+                                  for stop_id, details in data['data'].items()))
+
+    def touch(self, last_update, stop_lists=False):
+        with closing(self._connect()) as conn:
+            with conn:
+                version = self._next_version(conn)
+                conn.execute("UPDATE route_lists SET last_update = ?, version = ?"
+                             " WHERE company = ?",
+                             (last_update, version, self.company.value))
+                if stop_lists:
+                    conn.execute("UPDATE stop_lists SET last_update = ?, version = ?"
+                                 " WHERE company = ?",
+                                 (last_update, version, self.company.value))
+
+    def load_validators(self):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data FROM validators WHERE company = ?",
+                               (self.company.value,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def save_validators(self, data):
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO validators (company, data) VALUES (?, ?)",
+                             (self.company.value, json.dumps(data)))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _write_routes(self, conn: sqlite3.Connection, data: dict) -> None:
+        conn.execute("DELETE FROM routes WHERE company = ?", (self.company.value,))
+        conn.executemany("INSERT INTO routes (company, route_no, data) VALUES (?, ?, ?)",
+                         ((self.company.value, no, json.dumps(info))
+                          for no, info in data['data'].items()))
+        conn.execute("INSERT OR REPLACE INTO route_lists (company, last_update, version)"
+                     " VALUES (?, ?, ?)",
+                     (self.company.value, data['last_update'], self._next_version(conn)))
+
+    def _write_stops(self, conn: sqlite3.Connection, key: StopListKey, data: dict) -> None:
+        key = (self.company.value, key[0], key[1].value, key[2])
+        conn.execute("DELETE FROM stops"
+                     " WHERE company = ? AND route_no = ? AND direction = ? AND service_type = ?",
+                     key)
+        conn.executemany("INSERT INTO stops"
+                         " (company, route_no, direction, service_type, position, stop_id, data)"
+                         " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         ((*key, pos, str(stop['id']), json.dumps(stop))
+                          for pos, stop in enumerate(data['data'])))
+        conn.execute("INSERT OR REPLACE INTO stop_lists"
+                     " (company, route_no, direction, service_type, last_update, version)"
+                     " VALUES (?, ?, ?, ?, ?, ?)",
+                     (*key, data['last_update'], self._next_version(conn)))
+
+    @staticmethod
+    def _next_version(conn: sqlite3.Connection) -> int:
+        # a counter shared by all the writes of the database, so that a stamp
+        # is never reused, even by a stop list deleted and written again
+        conn.execute("INSERT INTO counters (name, value) VALUES ('version', 1)"
+                     " ON CONFLICT (name) DO UPDATE SET value = value + 1")
+        return conn.execute("SELECT value FROM counters WHERE name = 'version'").fetchone()[0]
+
+
+def migrate(src: Storage, dst: Storage) -> bool:
+    """Copy the data of `src` to `dst` if `dst` is empty.
+
+    Returns whether the data is copied.
+    """
+    if dst.load_routes() is not None or src.load_routes() is None:
+        return False
+
+    logging.info("Migrating route data from %s to %s...",
+                 type(src).__name__, type(dst).__name__)
+    dst.copy_from(src)
+    return True
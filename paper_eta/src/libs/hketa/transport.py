@@ -1,39 +1,43 @@
 import asyncio
-import csv
+import hashlib
 import io
 import json
 import logging
 import os
+import threading
+import time
 from abc import ABC, ABCMeta, abstractmethod
 from datetime import datetime
 from functools import cmp_to_key
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import (AsyncIterable, Awaitable, Callable, Iterable, Literal,
+                    Optional)
 
 import aiohttp
 
 try:
-    from . import api
+    from . import api, compact
+    from .catalogue import StopCatalogue, StopDetailsStore
     from .enums import Company, Direction, Locale
     from .exceptions import RouteError, RouteNotExist, ServiceTypeNotExist
+    from .fetcher import FetchEngine
     from .models import RouteInfo
+    from .refresh import RefreshJob
+    from .storage import JsonStorage, SqliteStorage, Storage, StopListKey, migrate
 except (ImportError, ModuleNotFoundError):
     import api
+    import compact
+    from catalogue import StopCatalogue, StopDetailsStore
     from enums import Company, Direction, Locale
     from exceptions import RouteError, RouteNotExist, ServiceTypeNotExist
+    from fetcher import FetchEngine
     from models import RouteInfo
+    from refresh import RefreshJob
+    from storage import JsonStorage, SqliteStorage, Storage, StopListKey, migrate
 
 _DIR_IMG = os.path.join(os.path.dirname(__file__), 'images', 'bw_neg')
 
 
-def stop_list_fname(no: str,
-                    direction: Direction,
-                    service_type: str) -> str:
-    """Get the file name of the stop list file.
-    """
-    return f"{no.upper()}-{direction.value.lower()}-{service_type.lower()}.json"
-
-
 def _append_timestamp(data: list | dict) -> dict[str,]:
     return {
         'last_update': datetime.now().isoformat(timespec="seconds"),
@@ -41,15 +45,50 @@ def _append_timestamp(data: list | dict) -> dict[str,]:
     }
 
 
-def _put_data_file(path: os.PathLike, data) -> None:
-    """Write `data` to local file system encoded in JSON format.
-    """
-    path = Path(str(path))
-    if not path.parent.exists():
-        os.makedirs(path.parent)
+def _digest(*values) -> str:
+    """Hash of the `values` (e.g. fields of a route list entry) for change detection."""
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+async def _group_stops(stops: AsyncIterable[tuple[StopListKey, RouteInfo.Stop]]
+                       ) -> dict[StopListKey, list[RouteInfo.Stop]]:
+    """Group the stops by route in a single pass, ordered by stop sequence."""
+    index: dict[StopListKey, list[RouteInfo.Stop]] = {}
+    async for key, stop in stops:
+        index.setdefault(key, []).append(stop)
+    for stop_list in index.values():
+        stop_list.sort(key=lambda s: s['seq'])
+    return index
+
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+async def _index_csv(url: str,
+                     parse: Callable[[list[str]], tuple[StopListKey, RouteInfo.Stop]]
+                     ) -> dict[StopListKey, list[RouteInfo.Stop]]:
+    """Group the stops of the CSV dataset at `url` by route, each (non-empty)
+    row after the header is parsed by `parse`."""
+    rows = api.iter_csv(url)
+
+    async def stops():
+        await anext(rows)  # ignore header line
+        async for row in rows:
+            if not any(row):  # skip empty row
+                continue
+            yield parse(row)
+    return await _group_stops(stops())
+
+
+def _index_route_list(index: dict[StopListKey, list[RouteInfo.Stop]]) -> dict[str, RouteInfo]:
+    """Create the route list from the stop lists of all routes."""
+    route_list: dict[str, RouteInfo] = {}
+    for (no, direction, service_type), stops in index.items():
+        route_list.setdefault(no, RouteInfo(inbound=[], outbound=[]))
+        route_list[no][direction.value].append(RouteInfo.Bound(
+            route_id=f"{no}_{direction.value}_{service_type}",
+            service_type=service_type,
+            orig=stops[0],
+            dest=stops[-1],
+        ))
+    return route_list
 
 
 class Transport(ABC):
@@ -63,17 +102,42 @@ class Transport(ABC):
         Language of information returns depends on the `RouteEntry` (if applicatable)
     """
     __path_prefix__: Optional[str] = None
-    _routes: dict[str, RouteInfo] = None
+
+    recheck: float = 60
+    """Seconds between checks of the storage for a rewritten route list"""
+
+    _datasets: tuple[str, ...] = ()
+    """URLs of the static datasets that the route data are built from,
+    the rebuild is skipped when none of them is modified"""
+
+    delta_sync: bool = True
+    """Refetch only the added or changed routes when rebuilding the route
+    list (if supported), keeping the stored data of the others"""
+
+    _catalogues: dict[tuple[Path, str], StopCatalogue] = {}
+    """Process-wide stop list catalogues, by data directory and storage type"""
+    _catalogues_lock = threading.Lock()
+
+    _refreshes: dict[Path, RefreshJob] = {}
+    """Process-wide route list refresh jobs, by data directory"""
+
+    _stop_details_stores: dict[tuple[Path, str], StopDetailsStore] = {}
+    """Process-wide stop details, by data directory and storage type"""
+
+    @property
+    def storage(self) -> Storage:
+        """Storage of the route and stop lists"""
+        return self._storage
 
     @property
-    def route_list_path(self) -> Path:
-        """Path to \"routes\" data file name"""
-        return self._root.joinpath('routes.json')
+    def refresh_job(self) -> RefreshJob:
+        """Job that rebuilds the route list"""
+        return self._refresh
 
     @property
-    def stops_list_dir(self) -> Path:
-        """Path to \"route\" data directory"""
-        return self._root.joinpath('routes')
+    def stop_details(self) -> StopDetailsStore:
+        """Details of the stops shared by all the routes"""
+        return self._stop_details
 
     @property
     def logo(self) -> io.BytesIO:
@@ -87,7 +151,8 @@ class Transport(ABC):
 
     def __init__(self,
                  root: os.PathLike[str] = None,
-                 threshold: int = 30) -> None:
+                 threshold: int = 30,
+                 storage: Literal["json", "sqlite"] = "json") -> None:
 
         if self.__path_prefix__ is None:
             self.__path_prefix__ = self.__class__.__name__.lower()
@@ -95,37 +160,83 @@ class Transport(ABC):
         self._root = Path(str(root)).joinpath(self.__path_prefix__)
         if not self._root.exists():
             logging.info("'%s' does not exists, creating...", root)
-            os.makedirs(self.stops_list_dir)
+            os.makedirs(self._root)
 
         self.threshold = threshold
 
+        with Transport._catalogues_lock:
+            if (self._root, storage) not in Transport._catalogues:
+                Transport._catalogues[(self._root, storage)] = \
+                    StopCatalogue(self._create_storage(storage))
+            self._catalogue = Transport._catalogues[(self._root, storage)]
+            self._stop_details = Transport._stop_details_stores.setdefault(
+                (self._root, storage), StopDetailsStore(self._catalogue.storage))
+            self._refresh = Transport._refreshes.setdefault(
+                self._root, RefreshJob(self.transport.value))
+        self._storage = self._catalogue.storage
+
+        self._routes: Optional[dict] = None
+        self._routes_stamp = None
+        self._routes_checked_at = 0.0
+        self._routes_lock = threading.Lock()
+        self._generation = self._refresh.generation
+
+    @classmethod
+    def discard(cls, root: os.PathLike[str]) -> None:
+        """Forget the shared stop lists, stop details and refresh jobs of the
+        `Transport`s in `root` (e.g. the directory is removed)."""
+        root = Path(str(root))
+        with Transport._catalogues_lock:
+            for registry in (Transport._catalogues,
+                             Transport._stop_details_stores,
+                             Transport._refreshes):
+                for key in [k for k in registry
+                            if (k[0] if isinstance(k, tuple) else k).parent == root]:
+                    del registry[key]
+
+    def reload(self) -> None:
+        """Drop the route list, stop lists and stop details in memory (e.g. the
+        storage is replaced), they are read again from the storage on demand."""
+        with self._routes_lock:
+            self._routes = None
+            self._routes_stamp = None
+        self._catalogue.clear()
+        self._stop_details.reload()
+
     def route_list(self) -> dict[str, RouteInfo]:
         """Retrive all route list and data operating by the operator.
 
-        Create/update local cache when necessary.
+        Create/update local cache when necessary. An outdated cache is
+        refreshed in background while it is still being served.
+
+        The parsed route list is kept in memory, and reloaded only when the
+        stored one is rewritten.
         """
+        if self._is_routes_changed():
+            with self._routes_lock:
+                if self._is_routes_changed():
+                    self._load_routes()
+
         if self._routes is None:
-            try:
-                with open(self.route_list_path, 'r', encoding='UTF-8') as f:
-                    self._routes = json.load(f)
-            except (FileNotFoundError, PermissionError):
-                logging.info("%s's route list cache do not exists, updating...",
-                             str(self.transport.value))
-
-                self._routes = _append_timestamp(
-                    asyncio.run(self._fetch_route_list()))
-                _put_data_file(self.route_list_path, self._routes)
-
-        if self._is_outdated(self._routes):
-            logging.info("%s's route list cache is outdated, updating...",
+            logging.info("%s's route list cache do not exists, updating...",
                          str(self.transport.value))
 
-            self._routes = _append_timestamp(
-                asyncio.run(self._fetch_route_list()))
-            _put_data_file(self.route_list_path, self._routes)
+            self._refresh.run(self._rebuild_route_list)
+            with self._routes_lock:
+                self._load_routes()
+        elif self._is_outdated(self._routes) and self.refresh_route_list():
+            logging.info("%s's route list cache is outdated, updating in background...",
+                         str(self.transport.value))
 
         return self._routes["data"]
 
+    def refresh_route_list(self, force: bool = False) -> bool:
+        """Rebuild the route list in background, see `refresh_job` for the progress.
+
+        Returns `False` if a rebuild is already running (or recently failed).
+        """
+        return self._refresh.start(self._rebuild_route_list, force)
+
     def stop_list(self,
                   route_no: str,
                   direction: Direction,
@@ -134,25 +245,182 @@ class Transport(ABC):
 
         Create/update local cache when necessary.
         """
+        return self._stop_entry(route_no, direction, service_type).stops
+
+    def stop_index(self,
+                   route_no: str,
+                   direction: Direction,
+                   service_type: str) -> dict[str, RouteInfo.Stop]:
+        """Retrive stops of the `route` by stop ID, ordered by stop sequence.
+
+        Create/update local cache when necessary.
+        """
+        return self._stop_entry(route_no, direction, service_type).index
+
+    def _stop_entry(self,
+                    route_no: str,
+                    direction: Direction,
+                    service_type: str) -> StopCatalogue.Entry:
         if route_no not in self.route_list().keys():
             raise RouteNotExist(route_no)
 
-        fpath = os.path.join(self.stops_list_dir,
-                             stop_list_fname(route_no, direction, service_type))
-
-        if self._is_outdated(fpath):
+        key = (route_no, direction, service_type)
+        entry = self._catalogue.get(key)
+        if entry is None or self._is_outdated(entry.last_update):
             logging.info(
                 "%s stop list cache is outdated, updating...", route_no)
 
-            stops = tuple(asyncio.run(
-                self._fetch_stop_list(route_no, direction, service_type)))
-            _put_data_file(
-                self.stops_list_dir.joinpath(stop_list_fname(route_no, direction, service_type)), _append_timestamp(stops))
-        else:
-            with open(fpath, "r", encoding="utf-8") as f:
-                stops = json.load(f)['data']
+            try:
+                entry = self._catalogue.put(key, _append_timestamp(tuple(asyncio.run(
+                    self._fetch_stop_list(route_no, direction, service_type)))))
+            finally:
+                self._stop_details.flush()
+        return entry
+
+    def _is_routes_changed(self) -> bool:
+        if self._routes is None or self._generation != self._refresh.generation:
+            return True
+        if time.monotonic() - self._routes_checked_at < self.recheck:
+            return False
+
+        # rewritten elsewhere (e.g. by another process)
+        self._routes_checked_at = time.monotonic()
+        return self._storage.routes_stamp() != self._routes_stamp
+
+    def _load_routes(self) -> None:
+        # stamp before loading, a concurrent rewrite is then picked up by the next check
+        self._generation = self._refresh.generation
+        self._routes_stamp = self._storage.routes_stamp()
+        self._routes_checked_at = time.monotonic()
+        if (routes := self._storage.load_routes()) is not None:
+            # a `dict` by route number, only the routes are compacted
+            routes['data'] = {no: compact.freeze(route) for no, route in routes['data'].items()}
+        self._routes = routes
+
+    def _rebuild_route_list(self) -> None:
+        if ((lastupd := self._stop_details.last_update) is not None
+                and self._is_outdated(lastupd)):
+            self._stop_details.clear()
+
+        if (validators := asyncio.run(self._revalidate())) is None:
+            logging.info("%s's route data is not modified, renewing...",
+                         str(self.transport.value))
+            self._storage.touch(datetime.now().isoformat(timespec="seconds"),
+                                self._storage.load_validators()['stop_lists'])
+            return
+
+        try:
+            previous = (self._storage.load_routes() or {}).get('data') if self.delta_sync else None
+            routes, stop_lists = asyncio.run(self._fetch_route_data())
+            if len(stop_lists) == 0:
+                # the new route list replaces the old one at once when it is saved
+                self._storage.save_routes(_append_timestamp(routes))
+                if previous:
+                    self._sync_stop_lists(previous, routes)
+            else:
+                self._storage.replace(
+                    _append_timestamp(routes),
+                    {key: _append_timestamp(stops) for key, stops in stop_lists.items()})
+                self._catalogue.clear()
+            self._storage.save_validators({
+                # whether the stop lists are built from the datasets as well
+                'stop_lists': len(stop_lists) > 0,
+                'datasets': validators,
+            })
+        finally:
+            # stop details fetched so far are reusable even if the build is failed
+            self._stop_details.flush()
 
-        return tuple(stops)
+    def _previous_bounds(self) -> dict[tuple[str, str, str], RouteInfo.Bound]:
+        """Get the bounds of the stored route list by (route, direction, service type)
+        for a delta sync, empty if `delta_sync` is disabled.
+        """
+        if not self.delta_sync:
+            return {}
+        routes = (self._storage.load_routes() or {}).get('data', {})
+        return {(no, direction, bound['service_type']): bound
+                for no, info in routes.items()
+                for direction in (Direction.INBOUND.value, Direction.OUTBOUND.value)
+                for bound in info.get(direction, [])}
+
+    def _sync_stop_lists(self,
+                         previous: dict[str, RouteInfo],
+                         current: dict[str, RouteInfo]) -> None:
+        """Renew the stored stop lists of the unchanged routes, and remove
+        the ones of the changed or removed routes (refetched on demand).
+        """
+        def identity(routes: dict[str, RouteInfo], key: StopListKey) -> Optional[tuple]:
+            no, direction, service_type = key
+            for b in routes.get(no, {}).get(direction.value, []):
+                if b['service_type'] == service_type:
+                    return (b['route_id'], b.get('digest'))
+            return None
+
+        for key in list(self._storage.stop_lists()):
+            current_id = identity(current, key)
+            if current_id is None or current_id[1] is None or current_id != identity(previous, key):
+                self._storage.delete_stops(*key)
+        self._storage.touch(datetime.now().isoformat(timespec="seconds"), stop_lists=True)
+        self._catalogue.clear()
+
+    async def _revalidate(self) -> Optional[dict[str, dict[str, str]]]:
+        """Check the `_datasets` for modification since the last build.
+
+        Returns `None` if none of them is modified, otherwise the validators
+        (by URL) of the latest datasets.
+        """
+        stored = {}
+        if self._storage.routes_stamp() is not None:
+            stored = (self._storage.load_validators() or {}).get('datasets', {})
+
+        try:
+            async with self._fetch_engine() as engine:
+                latest = await engine.map(
+                    lambda url: engine.fetch(api.revalidate, url, stored.get(url, {})),
+                    self._datasets)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.warning("Failed to revalidate %s's route data: %s",
+                            str(self.transport.value), e)
+            return {}
+
+        if (len(self._datasets) > 0
+                and all(v is None for v in latest)
+                and all(url in stored for url in self._datasets)):
+            return None
+        return {url: stored.get(url, {}) if v is None else v
+                for url, v in zip(self._datasets, latest)}
+
+    def _fetch_engine(self, checkpoint: Optional[str] = None) -> FetchEngine:
+        """Create a `FetchEngine` for fetching the route data.
+
+        With a `checkpoint` name, the results of `FetchEngine.map` are
+        checkpointed under the data directory and the progress is reported
+        to the `refresh_job` (i.e. for rebuilding the route list).
+        """
+        if checkpoint is None:
+            return FetchEngine()
+        return FetchEngine(checkpoint=self._root.joinpath(f".{checkpoint}.checkpoint"),
+                           progress=self._refresh)
+
+    def _create_storage(self, type_: Literal["json", "sqlite"]) -> Storage:
+        match type_:
+            case "json":
+                return JsonStorage(self._root)
+            case "sqlite":
+                storage = SqliteStorage(
+                    self._root.parent.joinpath('routes.db'), self.transport)
+                # reuse the data from the JSON files (if any)
+                migrate(JsonStorage(self._root), storage)
+                return storage
+            case _:
+                raise ValueError(f"Unrecognized storage: {type_}")
+
+    async def _fetch_route_data(self) -> tuple[dict[str, RouteInfo],
+                                               dict[StopListKey, list[RouteInfo.Stop]]]:
+        """Fetch the route list, along with the stop lists of all routes when
+        they are available in bulk (otherwise empty, fetched on demand).
+        """
+        return await self._fetch_route_list(), {}
 
     @abstractmethod
     async def _fetch_route_list(self) -> dict[str, RouteInfo]:
@@ -165,17 +433,11 @@ class Transport(ABC):
                                service_type: str) -> Iterable[RouteInfo.Stop]:
         pass
 
-    def _is_outdated(self, target: str | dict[str, datetime]) -> bool:
+    def _is_outdated(self, target: datetime | dict[str, str]) -> bool:
         """Determine whether the data is outdated.
         """
-        if isinstance(target, str):
-            fpath = Path(str(target))
-            if fpath.exists():
-                with open(fpath, "r", encoding="utf-8") as f:
-                    lastupd = datetime.fromisoformat(
-                        json.load(f)['last_update'])
-            else:
-                return True
+        if isinstance(target, datetime):
+            lastupd = target
         else:
             lastupd = datetime.fromisoformat(target['last_update'])
         return (datetime.now() - lastupd).days > self.threshold
@@ -194,37 +456,78 @@ class KowloonMotorBus(Transport):
     def transport(self) -> Company:
         return Company.KMB
 
+    bulk_ingest: bool = True
+    """Build the route list and all stop lists from the bulk datasets
+    (a few requests), instead of fetching the stops of every route"""
+
+    @property
+    def _datasets(self) -> tuple[str, ...]:
+        if self.bulk_ingest:
+            return (api.KMB_ROUTE_LIST_URL, api.KMB_ROUTE_STOP_LIST_ALL_URL, api.KMB_STOP_LIST_URL)
+        return (api.KMB_ROUTE_LIST_URL, )
+
+    async def _fetch_route_data(self):
+        if not self.bulk_ingest:
+            return await super()._fetch_route_data()
+
+        async def ingest_route_stops(session: aiohttp.ClientSession
+                                     ) -> dict[StopListKey, list[dict]]:
+            grouped: dict[StopListKey, list[dict]] = {}
+            async for stop in api.iter_json_array(api.KMB_ROUTE_STOP_LIST_ALL_URL, session=session):
+                grouped.setdefault((stop['route'],
+                                    Direction(self._bound_map[stop['bound']]),
+                                    stop['service_type']), []).append({'stop': stop['stop'],
+                                                                       'seq': stop['seq']})
+            for stops in grouped.values():
+                stops.sort(key=lambda s: int(s['seq']))
+            return grouped
+
+        async def ingest_stops(session: aiohttp.ClientSession) -> dict[str, dict]:
+            return {stop['stop']: stop
+                    async for stop in api.iter_json_array(api.KMB_STOP_LIST_URL, session=session)}
+
+        # the large datasets are parsed while they are being downloaded
+        async with self._fetch_engine("routes") as engine:
+            routes, grouped, details = await engine.map(
+                engine.fetch, (api.kmb_route_list, ingest_route_stops, ingest_stops))
+            self._stop_details.update(details)
+
+            fetch_details = self._fetch_stop_details(engine)
+            route_list, stop_lists = {}, {}
+            for route in routes['data']:
+                direction = self._bound_map[route['bound']]
+                key = (route['route'], Direction(direction), route['service_type'])
+                if key not in grouped:
+                    logging.warning("No stops for KMB route %s/%s/%s, skipping...", *key)
+                    continue
+
+                route_list.setdefault(route['route'], RouteInfo(inbound=[], outbound=[]))
+                route_list[route['route']][direction].append(self._bound(route, grouped[key]))
+                stop_lists[key] = [
+                    self._stop(stop, await self._stop_details.get(stop['stop'], fetch_details))
+                    for stop in grouped[key]
+                ]
+            return route_list, stop_lists
+
     async def _fetch_route_list(self):
-        async def fetch(session: aiohttp.ClientSession,
-                        stop: dict) -> tuple[str, str, RouteInfo.Bound]:
-            direction = self._bound_map[stop['bound']]
-            stop_list = (await api.kmb_route_stop_list(
-                stop['route'], direction, stop['service_type'], session))['data']
-            return (stop['route'], direction, {
-                'route_id': f"{stop['route']}_{direction}_{stop['service_type']}",
-                'service_type': stop['service_type'],
-                'orig': {
-                    'id': stop_list[0]['stop'],
-                    'seq': int(stop_list[0]['seq']),
-                    'name': {
-                        Locale.EN.value: stop.get('orig_en', "N/A"),
-                        Locale.TC.value:  stop.get('orig_tc', "未有資料"),
-                    }
-                },
-                'dest': {
-                    'id': stop_list[-1]['stop'],
-                    'seq': int(stop_list[-1]['seq']),
-                    'name': {
-                        Locale.EN.value: stop.get('dest_en', "N/A"),
-                        Locale.TC.value:  stop.get('dest_tc', "未有資料"),
-                    }
-                }
-            })
+        previous = self._previous_bounds()
+
+        async def fetch(route: dict) -> tuple[str, str, RouteInfo.Bound]:
+            direction = self._bound_map[route['bound']]
+            bound = previous.get((route['route'], direction, route['service_type']))
+            if bound is not None and bound.get('digest') == self._digest(route):
+                return (route['route'], direction, bound)
+
+            stop_list = (await engine.fetch(
+                api.kmb_route_stop_list, route['route'], direction, route['service_type']))['data']
+            return (route['route'], direction, self._bound(route, stop_list))
 
         route_list = {}
-        async with aiohttp.ClientSession() as session:
-            tasks = (fetch(session, stop) for stop in (await api.kmb_route_list(session))['data'])
-            for route in await asyncio.gather(*tasks):
+        async with self._fetch_engine("routes") as engine:
+            routes = (await engine.fetch(api.kmb_route_list))['data']
+            for route in await engine.map(
+                    fetch, routes,
+                    key=lambda r: f"{r['route']}_{r['bound']}_{r['service_type']}"):
                 route_list.setdefault(
                     route[0], RouteInfo(inbound=[], outbound=[]))
                 route_list[route[0]][route[1]].append(route[2])
@@ -237,27 +540,65 @@ class KowloonMotorBus(Transport):
         if route_no not in self.route_list().keys():
             raise RouteNotExist(route_no)
 
-        async def fetch(session: aiohttp.ClientSession, stop: dict):
-            dets = (await api.kmb_stop_details(stop['stop'], session))['data']
-            return RouteInfo.Stop(
-                id=stop['stop'],
-                seq=stop['seq'],
-                name={
-                    Locale.TC.value: dets.get('name_tc'),
-                    Locale.EN.value: dets.get('name_en'),
-                }
-            )
+        async def fetch(stop: dict):
+            return self._stop(
+                stop, await self._stop_details.get(stop['stop'], self._fetch_stop_details(engine)))
 
-        async with aiohttp.ClientSession() as session:
-            stop_list = await api.kmb_route_stop_list(
-                route_no, direction.value, service_type, session)
+        async with self._fetch_engine() as engine:
+            stop_list = await engine.fetch(
+                api.kmb_route_stop_list, route_no, direction.value, service_type)
 
-            stops = await asyncio.gather(
-                *[fetch(session, stop) for stop in stop_list['data']])
+            stops = await engine.map(fetch, stop_list['data'])
         if len(stops) == 0:
             raise RouteError(f"{route_no}/{direction.value}/{service_type}")
         return stops
 
+    def _bound(self, route: dict, stop_list: list[dict]) -> RouteInfo.Bound:
+        direction = self._bound_map[route['bound']]
+        return {
+            'route_id': f"{route['route']}_{direction}_{route['service_type']}",
+            'service_type': route['service_type'],
+            'digest': self._digest(route),
+            'orig': {
+                'id': stop_list[0]['stop'],
+                'seq': int(stop_list[0]['seq']),
+                'name': {
+                    Locale.EN.value: route.get('orig_en', "N/A"),
+                    Locale.TC.value:  route.get('orig_tc', "未有資料"),
+                }
+            },
+            'dest': {
+                'id': stop_list[-1]['stop'],
+                'seq': int(stop_list[-1]['seq']),
+                'name': {
+                    Locale.EN.value: route.get('dest_en', "N/A"),
+                    Locale.TC.value:  route.get('dest_tc', "未有資料"),
+                }
+            }
+        }
+
+    @staticmethod
+    def _digest(route: dict) -> str:
+        return _digest(route.get('orig_en'), route.get('orig_tc'),
+                       route.get('dest_en'), route.get('dest_tc'))
+
+    @staticmethod
+    def _stop(stop: dict, details: dict) -> RouteInfo.Stop:
+        return RouteInfo.Stop(
+            id=stop['stop'],
+            seq=stop['seq'],
+            name={
+                Locale.TC.value: details.get('name_tc'),
+                Locale.EN.value: details.get('name_en'),
+            }
+        )
+
+    @staticmethod
+    def _fetch_stop_details(engine: FetchEngine) -> Callable[[str], Awaitable[dict]]:
+        async def fetch(stop_id: str) -> dict:
+            return (await engine.fetch(api.kmb_stop_details, stop_id))['data']
+        return fetch
+
 
 class MTRBus(Transport):
     __path_prefix__ = "mtr_bus"
@@ -268,40 +609,18 @@ class MTRBus(Transport):
     }
     """Direction mapping to `hketa.Direction`"""
 
+    _datasets = (api.MTR_BUS_STOP_LIST_URL, )
+
     @property
     def transport(self) -> Company:
         return Company.MTRBUS
 
+    async def _fetch_route_data(self):
+        index = await _index_csv(api.MTR_BUS_STOP_LIST_URL, self._parse_row)
+        return _index_route_list(index), index
+
     async def _fetch_route_list(self):
-        route_list: dict[str, RouteInfo] = {}
-        next(apidata := csv.reader(await api.mtr_bus_stop_list()))
-
-        for row in apidata:
-            # column definition:
-            # route, direction, seq, stopID, stopLAT, stopLONG, stopTCName, stopENName
-            direction = self._bound_map[row[1]]
-            route_list.setdefault(row[0], RouteInfo(inbound=[], outbound=[]))
-
-            if row[2] == "1.00" or row[2] == "1":
-                # orignal
-                route_list[row[0]][direction].append({
-                    'route_id': f"{row[0]}_{direction}_default",
-                    'service_type': "default",
-                    'orig': RouteInfo.Stop(
-                        id=row[3],
-                        seq=int(row[2].strip(".00")),
-                        name={Locale.EN: row[7], Locale.TC: row[6]}
-                    ),
-                    'dest': {}
-                })
-            else:
-                # destination
-                route_list[row[0]][direction][0]['dest'] = RouteInfo.Stop(
-                    id=row[3],
-                    seq=int(row[2].strip(".00")),
-                    name={Locale.EN: row[7], Locale.TC: row[6]}
-                )
-        return route_list
+        return (await self._fetch_route_data())[0]
 
     async def _fetch_stop_list(self,
                                route_no: str,
@@ -310,16 +629,20 @@ class MTRBus(Transport):
         if (service_type != "default"):
             raise ServiceTypeNotExist(service_type)
 
-        stops = [stop for stop in csv.reader(await api.mtr_bus_stop_list())
-                 if stop[0] == route_no and self._bound_map[stop[1]] == direction]
-
-        if len(stops) == 0:
+        index = await _index_csv(api.MTR_BUS_STOP_LIST_URL, self._parse_row)
+        if (stops := index.get((route_no, direction, service_type))) is None:
             raise RouteNotExist(route_no)
-        return (RouteInfo.Stop(
-                id=stop[3],
-                seq=int(stop[2].strip(".00")),
-                name={Locale.TC: stop[6], Locale.EN: stop[7]}
-                ) for stop in stops)
+        return stops
+
+    def _parse_row(self, row: list[str]) -> tuple[StopListKey, RouteInfo.Stop]:
+        # column definition:
+        # route, direction, seq, stopID, stopLAT, stopLONG, stopTCName, stopENName
+        return ((row[0], Direction(self._bound_map[row[1]]), "default"),
+                RouteInfo.Stop(
+                    id=row[3],
+                    seq=int(float(row[2])),
+                    name={Locale.TC.value: row[6], Locale.EN.value: row[7]}
+        ))
 
 
 class MTRLightRail(Transport):
@@ -331,40 +654,18 @@ class MTRLightRail(Transport):
     }
     """Direction mapping to `hketa.Direction`"""
 
+    _datasets = (api.MTR_LRT_ROUTE_STOP_LIST_URL, )
+
     @property
     def transport(self) -> Company:
         return Company.MTRLRT
 
+    async def _fetch_route_data(self):
+        index = await _index_csv(api.MTR_LRT_ROUTE_STOP_LIST_URL, self._parse_row)
+        return _index_route_list(index), index
+
     async def _fetch_route_list(self) -> dict:
-        route_list = {}
-        next(apidata := csv.reader(await api.mtr_lrt_route_stop_list()))
-
-        for row in apidata:
-            # column definition:
-            # route, direction , stopCode, stopID, stopTCName, stopENName, seq
-            direction = self._bound_map[row[1]]
-            route_list.setdefault(row[0], {'inbound': [], 'outbound': []})
-
-            if (row[6] == "1.00"):
-                # original
-                route_list[row[0]][direction].append({
-                    'route_id': f"{row[0]}_{direction}_default",
-                    'service_type': "default",
-                    'orig': {
-                        'id': row[3],
-                        'seq': row[6],
-                        'name': {Locale.EN: row[5], Locale.TC: row[4]}
-                    },
-                    'dest': {}
-                })
-            else:
-                # destination
-                route_list[row[0]][direction][0]['dest'] = {
-                    'id': row[3],
-                    'seq': row[6],
-                    'name': {Locale.EN.value: row[5], Locale.TC.value: row[4]}
-                }
-        return route_list
+        return (await self._fetch_route_data())[0]
 
     async def _fetch_stop_list(self,
                                route_no: str,
@@ -375,16 +676,20 @@ class MTRLightRail(Transport):
         if route_no not in self.route_list().keys():
             raise RouteNotExist(route_no)
 
-        stops = [stop for stop in csv.reader(await api.mtr_lrt_route_stop_list())
-                 if stop[0] == route_no and self._bound_map[stop[1]] == direction]
-
-        if len(stops) == 0:
+        index = await _index_csv(api.MTR_LRT_ROUTE_STOP_LIST_URL, self._parse_row)
+        if (stops := index.get((route_no, direction, service_type))) is None:
             raise RouteNotExist(route_no)
-        return (RouteInfo.Stop(
-            id=stop[3],
-            seq=int(stop[6].strip('.00')),
-            name={Locale.TC.value: stop[4], Locale.EN.value: stop[5]}
-        ) for stop in stops)
+        return stops
+
+    def _parse_row(self, row: list[str]) -> tuple[StopListKey, RouteInfo.Stop]:
+        # column definition:
+        # route, direction , stopCode, stopID, stopTCName, stopENName, seq
+        return ((row[0], Direction(self._bound_map[row[1]]), "default"),
+                RouteInfo.Stop(
+                    id=row[3],
+                    seq=int(float(row[6])),
+                    name={Locale.TC.value: row[4], Locale.EN.value: row[5]}
+        ))
 
 
 class MTRTrain(Transport):
@@ -396,50 +701,18 @@ class MTRTrain(Transport):
     }
     """Direction mapping to `hketa.Direction`"""
 
+    _datasets = (api.MTR_TRAIN_ROUTE_STOP_LIST_URL, )
+
     @property
     def transport(self) -> Company:
         return Company.MTRTRAIN
 
-    async def _fetch_route_list(self) -> dict:
-        route_list = {}
-        apidata = csv.reader(await api.mtr_train_route_stop_list())
-        next(apidata)  # ignore header line
+    async def _fetch_route_data(self):
+        index = await _index_csv(api.MTR_TRAIN_ROUTE_STOP_LIST_URL, self._parse_row)
+        return _index_route_list(index), index
 
-        for row in apidata:
-            # column definition:
-            # Line Code, Direction, Station Code, Station ID, Chinese Name, English Name, Sequence
-            if not any(row):  # skip empty row
-                continue
-
-            direction, _, rt_type = row[1].partition("-")
-            if rt_type:
-                # route with multiple origin/destination
-                direction, rt_type = rt_type, direction  # e.g. LMC-DT
-                # make a "new line" for these type of route
-                row[0] += f"-{rt_type}"
-            direction = self._bound_map[direction]
-            route_list.setdefault(row[0], {'inbound': [], 'outbound': []})
-
-            if (row[6] == "1.00"):
-                # origin
-                route_list[row[0]][direction].append({
-                    'route_id': f"{row[0]}_{direction}_default",
-                    'service_type': "default",
-                    'orig': RouteInfo.Stop(
-                        id=row[2],
-                        seq=int(row[6].strip(".00")),
-                        name={Locale.EN.value: row[5], Locale.TC.value: row[4]}
-                    ),
-                    'dest': {}
-                })
-            else:
-                # destination
-                route_list[row[0]][direction][0]['dest'] = RouteInfo.Stop(
-                    id=row[2],
-                    seq=int(row[6].strip(".00")),
-                    name={Locale.EN.value: row[5], Locale.TC.value: row[4]}
-                )
-        return route_list
+    async def _fetch_route_list(self) -> dict:
+        return (await self._fetch_route_data())[0]
 
     async def _fetch_stop_list(self,
                                route_no: str,
@@ -450,48 +723,55 @@ class MTRTrain(Transport):
         if route_no not in self.route_list().keys():
             raise RouteNotExist(route_no)
 
-        apidata = csv.reader(await api.mtr_train_route_stop_list())
-        if "-" in route_no:
-            # route with multiple origin/destination (e.g. EAL-LMC)
-            rt_name, rt_type = route_no.split("-")
-            stops = [stop for stop in apidata
-                     if stop[0] == rt_name and rt_type in stop[1]]
-        else:
-            stops = [stop for stop in apidata
-                     if stop[0] == route_no
-                     and self._bound_map[stop[1].split("-")[-1]] == direction]
-            # stop[1] (direction) could contain not just the direction (e.g. LMC-DT)
-
-        if len(stops) == 0:
+        index = await _index_csv(api.MTR_TRAIN_ROUTE_STOP_LIST_URL, self._parse_row)
+        if (stops := index.get((route_no, direction, service_type))) is None:
             raise RouteNotExist(route_no)
-        return (RouteInfo.Stop(
-            id=stop[2],
-            seq=int(stop[-1].strip('.00')),
-            name={Locale.TC.value: stop[4], Locale.EN.value: stop[5]}
-        ) for stop in stops)
+        return stops
+
+    def _parse_row(self, row: list[str]) -> tuple[StopListKey, RouteInfo.Stop]:
+        # column definition:
+        # Line Code, Direction, Station Code, Station ID, Chinese Name, English Name, Sequence
+        direction, _, rt_type = row[1].partition("-")
+        if rt_type:
+            # route with multiple origin/destination
+            direction, rt_type = rt_type, direction  # e.g. LMC-DT
+            # make a "new line" for these type of route (e.g. EAL-LMC)
+            row[0] += f"-{rt_type}"
+
+        return ((row[0], Direction(self._bound_map[direction]), "default"),
+                RouteInfo.Stop(
+                    id=row[2],
+                    seq=int(float(row[6])),
+                    name={Locale.TC.value: row[4], Locale.EN.value: row[5]}
+        ))
 
 
 class CityBus(Transport):
     __path_prefix__ = 'ctb'
+    _datasets = (api.BRAVOBUS_ROUTE_LIST_URL.format(company="ctb"), )
 
     @property
     def transport(self) -> Company:
         return Company.CTB
 
     async def _fetch_route_list(self):
-        # Stop ID of the same stop from different route will have the same ID,
-        # caching the stop details to reduce the number of requests (around 600 - 700).
-        # Execution time is not guaranteed to be reduced.
-        stop_cache = {}
-
-        async def fetch(session: aiohttp.ClientSession, route: dict):
-            nonlocal stop_cache
+        previous = self._previous_bounds()
+
+        async def fetch(route: dict):
+            digest = _digest(route.get('orig_en'), route.get('orig_tc'),
+                             route.get('dest_en'), route.get('dest_tc'))
+            bounds = {d: previous.get((route['route'], d, "default"))
+                      for d in (Direction.INBOUND.value, Direction.OUTBOUND.value)}
+            if (any(bounds.values())
+                    and all(b is None or b.get('digest') == digest for b in bounds.values())):
+                return (route['route'],
+                        RouteInfo(**{d: [b] if b else [] for d, b in bounds.items()}))
 
             directions = {
-                'inbound': (await api.bravobus_route_stop_list(
-                    "ctb", route['route'], "inbound", session))['data'],
-                'outbound': (await api.bravobus_route_stop_list(
-                    "ctb", route['route'], "outbound", session))['data']
+                'inbound': (await engine.fetch(
+                    api.bravobus_route_stop_list, "ctb", route['route'], "inbound"))['data'],
+                'outbound': (await engine.fetch(
+                    api.bravobus_route_stop_list, "ctb", route['route'], "outbound"))['data']
             }
 
             info = RouteInfo(inbound=[], outbound=[])
@@ -499,39 +779,39 @@ class CityBus(Transport):
                 if len(stop_list) == 0:
                     continue
 
-                stop_cache.setdefault(stop_list[0]['stop'],
-                                      (await api.bravobus_stop_details(stop_list[0]['stop'], session))['data'])
-                stop_cache.setdefault(stop_list[-1]['stop'],
-                                      (await api.bravobus_stop_details(stop_list[0]['stop'], session))['data'])
+                orig, dest = await asyncio.gather(
+                    self._stop_details.get(stop_list[0]['stop'], self._fetch_stop_details(engine)),
+                    self._stop_details.get(stop_list[-1]['stop'], self._fetch_stop_details(engine)))
 
                 info[direction] = [RouteInfo.Bound(
                     route_id=f"{route['route']}_{direction}_default",
                     service_type="default",
+                    digest=digest,
                     orig={
                         'id': stop_list[0]['stop'],
                         'seq': stop_list[0]['seq'],
                         'name': {
-                            Locale.EN.value: stop_cache[stop_list[0]['stop']].get('name_en', "N/A"),
-                            Locale.TC.value:  stop_cache[stop_list[0]['stop']].get('name_tc', "未有資料"),
+                            Locale.EN.value: orig.get('name_en', "N/A"),
+                            Locale.TC.value:  orig.get('name_tc', "未有資料"),
                         }
                     },
                     dest={
                         'id': stop_list[-1]['stop'],
                         'seq': stop_list[-1]['seq'],
                         'name': {
-                            Locale.EN.value: stop_cache[stop_list[-1]['stop']].get('name_en', "N/A"),
-                            Locale.TC.value:  stop_cache[stop_list[-1]['stop']].get('name_tc', "未有資料"),
+                            Locale.EN.value: dest.get('name_en', "N/A"),
+                            Locale.TC.value:  dest.get('name_tc', "未有資料"),
                         }
                     }
                 )]
             return (route['route'], info)
 
-        async with aiohttp.ClientSession() as session:
-            tasks = [fetch(session, stop) for stop in
-                     (await api.bravobus_route_list("ctb", session))['data']]
+        async with self._fetch_engine("routes") as engine:
+            routes = (await engine.fetch(api.bravobus_route_list, "ctb"))['data']
 
             # keys()[0] = route name
-            return {route[0]: route[1] for route in await asyncio.gather(*tasks)}
+            return {route[0]: route[1]
+                    for route in await engine.map(fetch, routes, key=lambda r: r['route'])}
 
     async def _fetch_stop_list(self,
                                route_no: str,
@@ -542,8 +822,8 @@ class CityBus(Transport):
         if route_no not in self.route_list().keys():
             raise RouteNotExist(route_no)
 
-        async def fetch(session: aiohttp.ClientSession, stop: dict):
-            dets = (await api.bravobus_stop_details(stop['stop'], session))['data']
+        async def fetch(stop: dict):
+            dets = await self._stop_details.get(stop['stop'], self._fetch_stop_details(engine))
             return RouteInfo.Stop(
                 id=stop['stop'],
                 seq=int(stop['seq']),
@@ -553,34 +833,54 @@ class CityBus(Transport):
                 }
             )
 
-        async with aiohttp.ClientSession() as session:
-            stop_list = await asyncio.gather(
-                *[fetch(session, stop) for stop in
-                  (await api.bravobus_route_stop_list("ctb",
-                                                      route_no,
-                                                      direction.value,
-                                                      session)
-                   )['data']]
+        async with self._fetch_engine() as engine:
+            stop_list = await engine.map(
+                fetch,
+                (await engine.fetch(api.bravobus_route_stop_list,
+                                    "ctb",
+                                    route_no,
+                                    direction.value)
+                 )['data']
             )
 
             if len(stop_list) == 0:
                 raise RouteNotExist(route_no)
             return stop_list
 
+    @staticmethod
+    def _fetch_stop_details(engine: FetchEngine) -> Callable[[str], Awaitable[dict]]:
+        async def fetch(stop_id: str) -> dict:
+            return (await engine.fetch(api.bravobus_stop_details, stop_id))['data']
+        return fetch
+
 
 class NewLantaoBus(Transport):
 
     __path_prefix__ = 'nlb'
+    _datasets = (api.NLB_ROUTE_LIST_URL, )
 
     @property
     def transport(self) -> Company:
         return Company.NLB
 
     async def _fetch_route_list(self):
-        async def fetch(route: dict, session: aiohttp.ClientSession):
-            stops = (await api.nlb_route_stop_list(route['routeId'], session))['stops']
+        previous = {b['route_id']: b for b in self._previous_bounds().values()}
+
+        async def fetch(route: dict):
+            digest = _digest(route['routeNo'], route.get('routeName_e'), route.get('routeName_c'))
+            if ((bound := previous.get(route['routeId'])) is not None
+                    and bound.get('digest') == digest):
+                return (route['routeNo'], {
+                    "route_id": bound['route_id'],
+                    "orig": bound['orig'],
+                    "dest": bound['dest'],
+                    "digest": digest,
+                })
+
+            stops = (await engine.fetch(api.nlb_route_stop_list, route['routeId']))['stops']
             return (route['routeNo'], {
                 "route_id": route['routeId'],
+                "digest": digest,
                 "orig": {
                     "id": stops[0]['stopId'],
                     "seq": 1,
@@ -595,12 +895,12 @@ class NewLantaoBus(Transport):
 
         # sort to ensure normal service comes before special service
         # (id of normal services is usually smaller than special service)
-        async with aiohttp.ClientSession() as s:
-            routes = await asyncio.gather(
-                *[fetch(r, s) for r in
-                  sorted((await api.nlb_route_list(s))['routes'],
-                         key=cmp_to_key(lambda a, b: int(a['routeId']) - int(b['routeId'])))
-                  ]
+        async with self._fetch_engine("routes") as engine:
+            routes = await engine.map(
+                fetch,
+                sorted((await engine.fetch(api.nlb_route_list))['routes'],
+                       key=cmp_to_key(lambda a, b: int(a['routeId']) - int(b['routeId']))),
+                key=lambda r: r['routeId']
             )
 
         route_list = {}
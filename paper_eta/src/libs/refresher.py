@@ -64,6 +64,13 @@ def _write_log(**kwargs):
     exts.db.session.commit()
 
 
+@_with_app_context
+def enabled_queries() -> list[hketa.RouteQuery]:
+    """Get the queries of all the enabled bookmarks (i.e. the ETAs to be polled)."""
+    return [hketa.RouteQuery(**bm.as_dict())
+            for bm in database.Bookmark.query.filter(database.Bookmark.enabled).all()]
+
+
 @_with_app_context
 def scheduled_refresh(schedule: "database.Schedule"):
     """Function that handles scheduled refresh based on the input schedule.
@@ -108,9 +115,9 @@ def refresh(bookmarks: Iterable["database.Bookmark"],
         _write_log(**locals(), error_message=str(e))
         return False
 
-    images = renderer_.draw([exts.hketa.create_eta_processor(query).etas()
-                             for query in (hketa.RouteQuery(**bm.as_dict()) for bm in bookmarks)],
-                            degree)
+    images = renderer_.draw(
+        exts.hketa.etas_many(hketa.RouteQuery(**bm.as_dict()) for bm in bookmarks),
+        degree)
 
     try:
         old_screens = load_images(screen_dump_dir)
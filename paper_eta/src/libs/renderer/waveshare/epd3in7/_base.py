@@ -52,8 +52,9 @@ class Epd3in8RenderBase(ImageRenderer):
                         Image.open(route.logo).convert("1").resize((30, 30)))
             draw.rectangle_wh((0, row*row_h), (35, 35))
 
-            draw.text_responsive(route.no, (38, row*row_h),
-                                 (112, 35), FONT_NAME)
+            # "*" marks the ETAs are from an earlier fetch
+            draw.text_responsive(f"{route.no}*" if route.is_stale else route.no,
+                                 (38, row*row_h), (112, 35), FONT_NAME)
             draw.text_responsive(
                 route.destination, (0, 35 + row*row_h), (150, 22.5), FONT_STOP)
             draw.text_responsive(
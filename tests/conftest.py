@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from paper_eta.src.libs.epdcon import bus
+
+GRAYS = (0, 0x40, 0x80, 0xC0, 0xC1, 0x7F, 37, 200, 255)
+"""Gray levels of the test images, the 4 levels of the drivers and in between"""
+
+
+def draw_image(size: tuple[int, int],
+               mode: str = 'L',
+               colours: bool = False,
+               seed: int = 1) -> Image.Image:
+    """A deterministic image of ellipses in `GRAYS` (or random colours) and
+    some text, converted to `mode`."""
+    rand = random.Random(seed)
+    image = Image.new('RGB', size, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for _ in range(80):
+        x, y = rand.randrange(size[0]), rand.randrange(size[1])
+        fill = (tuple(rand.randrange(256) for _ in range(3)) if colours
+                else (rand.choice(GRAYS),) * 3)
+        draw.ellipse((x, y, x + 30, y + 20), fill=fill)
+    draw.text((5, 5), "ETA 12 min", fill=(0, 0, 0))
+    return image.convert(mode)
+
+
+@pytest.fixture(name="draw")
+def _draw():
+    """`draw_image`, the test image of the display tests."""
+    return draw_image
+
+
+@pytest.fixture
+def backend() -> bus.FakeBackend:
+    """A `FakeBackend` installed as the `epdconfig` of the Waveshare drivers,
+    which are then imported without the hardware (and without probing for it)."""
+    fake = bus.FakeBackend()
+    bus.install(fake)
+    return fake
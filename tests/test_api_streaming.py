@@ -0,0 +1,83 @@
+"""Memory bound of the streaming dataset readers of `hketa.api`."""
+import asyncio
+import json
+import tracemalloc
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from paper_eta.src.libs.hketa import api
+
+ROWS = 50_000
+"""Rows/elements of the synthetic datasets (several MB each)"""
+
+PEAK_LIMIT = 3 * 1024 * 1024 // 2
+"""Bytes the readers may allocate at peak, far less than a dataset"""
+
+
+def _csv_rows(start: int, count: int) -> bytes:
+    return "".join(f"{i % 900},O,{i % 40},ST{i:06d},Stop {i},車站 {i},{i / 7:.3f}\n"
+                   for i in range(start, start + count)).encode("utf-8")
+
+
+def _json_elements(start: int, count: int) -> bytes:
+    return ",".join(json.dumps({"route": str(i % 900), "bound": "O", "service_type": "1",
+                                "seq": str(i % 40), "stop": f"{i:016X}",
+                                "name_tc": f"車站 {i}"}, ensure_ascii=False)
+                    for i in range(start, start + count)).encode("utf-8")
+
+
+async def _stream(request: web.Request, head: bytes, body, tail: bytes) -> web.StreamResponse:
+    # generated chunk by chunk, the server does not hold the dataset either
+    response = web.StreamResponse()
+    await response.prepare(request)
+    await response.write(head)
+    for start in range(0, ROWS, 1000):
+        await response.write(body(start, 1000))
+        if tail and start + 1000 < ROWS:
+            await response.write(b",")
+    await response.write(tail)
+    return response
+
+
+async def _csv(request: web.Request) -> web.StreamResponse:
+    return await _stream(request, "﻿ROUTE_ID,DIRECTION,SEQ,STATION_ID,NAME_EN,NAME_TC,KM\n"
+                         .encode("utf-8"), _csv_rows, b"")
+
+
+async def _json(request: web.Request) -> web.StreamResponse:
+    return await _stream(request, b'{"type": "RouteStopList", "data": [', _json_elements, b"]}")
+
+
+async def _measure(path: str, reader) -> tuple[int, int, int]:
+    """Returns the number of items read, the size of the response and the peak allocation."""
+    app = web.Application()
+    app.router.add_get("/csv", _csv)
+    app.router.add_get("/json", _json)
+    async with TestServer(app) as server:
+        tracemalloc.start()
+        try:
+            count, size = 0, 0
+            async for item in reader(str(server.make_url(path))):
+                count += 1
+                size += len(json.dumps(item))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return count, size, peak
+
+
+def test_iter_csv_memory_is_bounded():
+    count, size, peak = asyncio.run(_measure("/csv", api.iter_csv))
+
+    assert count == ROWS + 1  # with the header
+    assert size > 2 * PEAK_LIMIT
+    assert peak < PEAK_LIMIT
+
+
+def test_iter_json_array_memory_is_bounded():
+    count, size, peak = asyncio.run(_measure("/json", api.iter_json_array))
+
+    assert count == ROWS
+    assert size > 2 * PEAK_LIMIT
+    assert peak < PEAK_LIMIT
@@ -0,0 +1,60 @@
+"""`hketa.breaker.CircuitBreaker` on the responses of a local server."""
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from paper_eta.src.libs.hketa import breaker
+
+
+async def _status(request: web.Request) -> web.Response:
+    return web.Response(status=int(request.match_info['status']))
+
+
+async def _get(breaker_: breaker.CircuitBreaker, statuses: list[int]) -> list[str]:
+    """Request the `statuses` in order (raising for status, as `hketa.api` does),
+    returns the outcome of each request."""
+    app = web.Application()
+    app.router.add_get("/{status}", _status)
+    outcomes = []
+    async with TestServer(app) as server, \
+            aiohttp.ClientSession(trace_configs=[breaker_.trace_config()]) as session:
+        for status in statuses:
+            try:
+                async with session.get(server.make_url(f"/{status}"), raise_for_status=True):
+                    outcomes.append("ok")
+            except breaker.CircuitOpen:
+                outcomes.append("open")
+            except aiohttp.ClientResponseError as e:
+                outcomes.append(str(e.status))
+    return outcomes
+
+
+def test_client_errors_do_not_open_the_circuit():
+    breaker_ = breaker.CircuitBreaker(threshold=3)
+
+    outcomes = asyncio.run(_get(breaker_, [404] * 4 + [200]))
+
+    assert outcomes == ["404"] * 4 + ["ok"]
+    assert breaker_.state("127.0.0.1") == "closed"
+
+
+@pytest.mark.parametrize("status", (503, 429))
+def test_server_errors_open_the_circuit(status):
+    breaker_ = breaker.CircuitBreaker(threshold=3)
+
+    outcomes = asyncio.run(_get(breaker_, [status] * 4))
+
+    assert outcomes == [str(status)] * 3 + ["open"]
+    assert breaker_.state("127.0.0.1") == "open"
+
+
+def test_success_resets_the_failures():
+    breaker_ = breaker.CircuitBreaker(threshold=3)
+
+    outcomes = asyncio.run(_get(breaker_, [503, 503, 404, 503, 503, 200]))
+
+    assert outcomes == ["503", "503", "404", "503", "503", "ok"]
+    assert breaker_.state("127.0.0.1") == "closed"
@@ -0,0 +1,89 @@
+"""`epdcon.bus` on a `FakeBackend`."""
+import importlib
+import time
+
+import pytest
+
+from paper_eta.src.libs.epdcon import bus
+
+LIB = "paper_eta.src.libs.epdcon.waveshare"
+
+
+def test_write_is_split_at_max_transfer(backend):
+    spi = bus.SpiBus(backend, backend.DC_PIN, backend.CS_PIN, max_transfer=4096)
+    data = bytes(range(256)) * 40  # 10240 bytes
+
+    spi.write(data)
+
+    assert [len(t.data) for t in backend.transfers] == [4096, 4096, 2048]
+    assert b''.join(t.data for t in backend.transfers) == data
+
+
+def test_write_accepts_list_of_ints(backend):
+    spi = bus.SpiBus(backend, backend.DC_PIN, backend.CS_PIN, max_transfer=3)
+
+    spi.write([1, 2, 3, 4])
+
+    assert [t.data for t in backend.transfers] == [b'\x01\x02\x03', b'\x04']
+
+
+def test_send_selects_the_chip_once(backend):
+    spi = bus.SpiBus(backend, backend.DC_PIN, backend.CS_PIN)
+
+    spi.send(0x24, b'\x00' * 5000)
+
+    assert backend.stream() == [(0, b'\x24'), (1, b'\x00' * 5000)]
+    assert backend.pins[backend.CS_PIN] == 1
+    # DC and CS low, DC high, CS high
+    assert backend.counts["pin_writes"] == 4
+
+
+def test_send_many_matches_epd3in7_driver(backend, draw):
+    epd = importlib.import_module(f"{LIB}.epd_lib.epd3in7").EPD()
+    ctl = importlib.import_module(f"{LIB}.epd3in7").Controller(True)
+    image = draw((280, 480), '1')
+
+    epd.display_1Gray(epd.getbuffer(image))
+    expected, driver_stats = backend.stream(), backend.stats()
+    backend.reset()
+    ctl._display_1gray(ctl._getbuffer(image))  # pylint: disable=protected-access
+
+    assert backend.stream() == expected
+    assert backend.stats()["bytes"] == driver_stats["bytes"]
+    assert backend.stats()["pin_writes"] < driver_stats["pin_writes"]
+
+
+def test_wait_idle_wakes_on_the_edge(backend):
+    backend.busy_for(0.2)
+    started = time.monotonic()
+
+    bus.wait_idle(backend, backend.BUSY_PIN, 1, timeout=5)
+
+    # woken up by the edge, not by the recheck of the pin (every second)
+    assert 0.2 <= time.monotonic() - started < 0.8
+    assert backend.counts["busy_reads"] == 2
+    assert backend.pins[backend.BUSY_PIN] == 0
+
+
+def test_wait_idle_polls_without_edges():
+    backend = bus.FakeBackend(busy_level=0, edges=False, realtime=True)
+    backend.busy_for(0.2)
+    queries = []
+
+    bus.wait_idle(backend, backend.BUSY_PIN, 0,
+                  query=lambda: queries.append(1), poll_ms=20, timeout=5)
+
+    assert backend.counts["busy_reads"] == len(queries) > 5
+    assert backend.counts["delay_ms"] >= 180
+    assert backend.pins[backend.BUSY_PIN] == 1
+
+
+@pytest.mark.parametrize("edges", (True, False))
+def test_wait_idle_times_out(edges):
+    backend = bus.FakeBackend(edges=edges, realtime=True)
+    timer = backend.busy_for(10)
+    try:
+        with pytest.raises(TimeoutError):
+            bus.wait_idle(backend, backend.BUSY_PIN, 1, timeout=0.2)
+    finally:
+        timer.cancel()
@@ -0,0 +1,108 @@
+"""Request coalescing and caching of `hketa.client.HttpClient` (and `hketa.cache.TtlCache`)."""
+import asyncio
+import functools
+import time
+
+import pytest
+
+from paper_eta.src.libs.hketa import cache, client
+
+
+def _upstream(delay: float = 0.05):
+    """An API function answering after `delay` seconds, and the stops of its calls."""
+    calls = []
+
+    async def eta(stop: str, *, session) -> dict:  # pylint: disable=unused-argument
+        calls.append(stop)
+        await asyncio.sleep(delay)
+        return {"stop": stop, "call": len(calls)}
+    return eta, calls
+
+
+@pytest.fixture(name="http")
+def _http():
+    http = client.HttpClient()
+    yield http
+    http.close()
+
+
+def test_concurrent_identical_requests_are_coalesced(http):
+    eta, calls = _upstream()
+
+    async def fetch_all():
+        return await asyncio.gather(
+            *(http.fetch(functools.partial(eta, "A")) for _ in range(5)),
+            http.fetch(functools.partial(eta, "B")))
+
+    results = http.run(fetch_all())
+
+    assert sorted(calls) == ["A", "B"]
+    assert results[:5] == [results[0]] * 5
+    assert results[5]["stop"] == "B"
+
+
+def test_completed_request_is_not_reused_without_ttl(http):
+    eta, calls = _upstream(delay=0)
+
+    first = http.run(http.fetch(functools.partial(eta, "A")))
+    second = http.run(http.fetch(functools.partial(eta, "A")))
+
+    assert (first["call"], second["call"]) == (1, 2)
+    assert len(calls) == 2
+
+
+def test_fresh_response_is_served_from_cache(http):
+    eta, calls = _upstream(delay=0)
+
+    first = http.run(http.fetch(functools.partial(eta, "A"), ttl=5))
+    second = http.run(http.fetch(functools.partial(eta, "A"), ttl=5))
+
+    assert second == first
+    assert len(calls) == 1
+    assert http.cache.stats() == {'size': 1, 'hits': 1, 'stale_hits': 0, 'misses': 1}
+
+
+def test_stale_response_is_served_and_revalidated(http):
+    eta, calls = _upstream(delay=0.05)
+    request = functools.partial(eta, "A")
+    http.run(http.fetch(request, ttl=0.1, stale=5))
+    time.sleep(0.15)
+
+    started = time.monotonic()
+    stale = http.run(http.fetch(request, ttl=0.1, stale=5))
+
+    # served at once, without waiting for the upstream
+    assert time.monotonic() - started < 0.05
+    assert stale["call"] == 1
+    assert http.cache.stale_hits == 1
+
+    time.sleep(0.1)
+    fresh = http.run(http.fetch(request, ttl=0.1, stale=5))
+
+    assert fresh["call"] == 2
+    assert len(calls) == 2
+    assert http.cache.stats() == {'size': 1, 'hits': 1, 'stale_hits': 1, 'misses': 1}
+
+
+def test_expired_response_beyond_stale_is_refetched(http):
+    eta, calls = _upstream(delay=0)
+    request = functools.partial(eta, "A")
+    http.run(http.fetch(request, ttl=0.05, stale=0.05))
+    time.sleep(0.15)
+
+    again = http.run(http.fetch(request, ttl=0.05, stale=0.05))
+
+    assert again["call"] == 2
+    assert len(calls) == 2
+    assert http.cache.stats() == {'size': 1, 'hits': 0, 'stale_hits': 0, 'misses': 2}
+
+
+def test_cache_evicts_least_recently_used():
+    ttl_cache = cache.TtlCache(maxsize=2)
+    ttl_cache.put("a", 1)
+    ttl_cache.put("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.put("c", 3)
+
+    assert ttl_cache.get("b") is None
+    assert (ttl_cache.get("a").value, ttl_cache.get("c").value) == (1, 3)
@@ -0,0 +1,47 @@
+"""`epdcon.packing` against the `getbuffer` of the Waveshare drivers."""
+import importlib
+
+import pytest
+
+from paper_eta.src.libs.epdcon import packing
+
+DRIVERS_1BIT = ('epd1in02', 'epd1in54', 'epd1in54_V2', 'epd3in7', 'epd4in2b_V2')
+
+
+def _driver(name: str):
+    return importlib.import_module(f"paper_eta.src.libs.epdcon.waveshare.epd_lib.{name}").EPD()
+
+
+def _sizes(epd) -> list[tuple[int, int]]:
+    """Horizontal, vertical and a wrong size of the panel of `epd`."""
+    return [(epd.width, epd.height), (epd.height, epd.width), (epd.width + 8, epd.height)]
+
+
+@pytest.mark.usefixtures("backend")
+@pytest.mark.parametrize("name", DRIVERS_1BIT)
+@pytest.mark.parametrize("mode", ('L', '1', 'RGB'))
+def test_pack_1bit_matches_getbuffer(draw, name, mode):
+    epd = _driver(name)
+    for size in _sizes(epd):
+        image = draw(size, mode)
+
+        assert packing.pack_1bit(image, epd.width, epd.height) == epd.getbuffer(image), size
+
+
+DRIVERS_PALETTE = (
+    [(name, packing.PALETTE_7COLOR) for name in ('epd5in65f', 'epd7in3f')]
+    + [(name, packing.PALETTE_4COLOR) for name in ('epd1in64g', 'epd2in13g', 'epd2in36g',
+                                                   'epd2in66g', 'epd3in0g', 'epd4in37g',
+                                                   'epd7in3g')])
+
+
+@pytest.mark.usefixtures("backend")
+@pytest.mark.parametrize("name, palette", DRIVERS_PALETTE)
+def test_pack_palette_matches_getbuffer(draw, name, palette):
+    epd = _driver(name)
+    # the drivers fail on an image of any other size
+    for size in dict.fromkeys(((epd.width, epd.height), (epd.height, epd.width))):
+        image = draw(size, 'RGB', colours=True)
+
+        assert packing.pack_palette(image, epd.width, epd.height, palette) \
+            == epd.getbuffer(image), size
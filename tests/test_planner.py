@@ -0,0 +1,48 @@
+"""API call planning of `hketa.planner.plan`."""
+import types
+
+from paper_eta.src.libs.hketa import api, client, enums, models, planner
+from paper_eta.src.libs.hketa.eta_processor import KmbEta
+
+
+def _kmb(no: str, stop_id: str, service_type: str = "1") -> KmbEta:
+    return KmbEta(types.SimpleNamespace(entry=models.RouteQuery(
+        transport=enums.Company.KMB, no=no, direction=enums.Direction.OUTBOUND,
+        stop_id=stop_id, service_type=service_type, locale=enums.Locale.TC)))
+
+
+def _calls(requests) -> list[tuple]:
+    return [(r.func, *r.args) for r in requests]
+
+
+def test_single_route_keeps_the_route_call():
+    assert _calls(planner.plan([_kmb("1A", "S1")])) == [(api.kmb_eta, "1A", "1")]
+
+
+def test_routes_at_the_same_stop_share_the_stop_call():
+    requests = planner.plan([_kmb("1A", "S1"), _kmb("2", "S1"), _kmb("5C", "S1")])
+
+    assert _calls(requests) == [(api.kmb_stop_eta, "S1")] * 3
+
+
+def test_calls_are_minimal():
+    processors = [_kmb("1A", "S1"), _kmb("2", "S1"),  # a shared stop
+                  _kmb("6", "S2"), _kmb("6", "S3"),   # a shared route
+                  _kmb("9", "S4")]                    # on its own
+
+    requests = planner.plan(processors)
+
+    assert _calls(requests) == [(api.kmb_stop_eta, "S1"), (api.kmb_stop_eta, "S1"),
+                                (api.kmb_eta, "6", "1"), (api.kmb_eta, "6", "1"),
+                                (api.kmb_eta, "9", "1")]
+    assert len({client.request_key(r) for r in requests}) == 3
+
+
+def test_cached_calls_are_preferred():
+    processors = [_kmb("1A", "S1"), _kmb("2", "S1")]
+
+    # the route calls are cached, the stop call is not
+    requests = planner.plan(processors,
+                            lambda request, processor: 0 if request.func is api.kmb_eta else 1)
+
+    assert _calls(requests) == [(api.kmb_eta, "1A", "1"), (api.kmb_eta, "2", "1")]
@@ -0,0 +1,91 @@
+"""Export and import of the route data snapshots of `hketa.factories.EtaFactory`."""
+import gzip
+import json
+
+import pytest
+
+from paper_eta.src.libs.hketa import enums, exceptions, factories, snapshot
+
+ROUTES = {'last_update': '2026-10-18T00:00:00',
+          'data': {'1': {'inbound': [], 'outbound': []}}}
+
+
+@pytest.fixture(name="factory", params=("json", "sqlite"))
+def _factory(request, tmp_path):
+    factory = factories.EtaFactory(tmp_path / "data", 30, request.param)
+    yield factory
+    factory.close()
+
+
+@pytest.fixture(name="exported")
+def _exported(factory, tmp_path):
+    """A snapshot of the route list `ROUTES`, after which the stored route list is changed."""
+    storage = factory.create_transport(enums.Company.KMB).storage
+    storage.save_routes(ROUTES)
+    factory.export_snapshot(tmp_path / "snapshot.gz")
+
+    storage.save_routes({'last_update': '2026-10-18T12:00:00',
+                         'data': {'2': {'inbound': [], 'outbound': []}}})
+    return tmp_path / "snapshot.gz"
+
+
+def _rewrite(fpath, header=None, body=None) -> None:
+    with gzip.open(fpath, "rb") as f:
+        lines = f.readline(), f.read()
+    with gzip.open(fpath, "wb") as f:
+        f.write(lines[0] if header is None else json.dumps(header).encode("utf-8") + b"\n")
+        f.write(lines[1] if body is None else body(lines[1]))
+
+
+def _assert_untouched(factory, tmp_path) -> None:
+    transport = factory.create_transport(enums.Company.KMB)
+    assert list(transport.storage.load_routes()['data']) == ['2']
+    # the staging directory is removed
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data", "snapshot.gz"]
+
+
+def test_import_replaces_the_route_data(factory, exported, tmp_path):
+    transport = factory.create_transport(enums.Company.KMB)
+    assert list(transport.route_list()) == ['2']
+
+    header = factory.import_snapshot(exported)
+
+    assert header['companies'] == [enums.Company.KMB.value]
+    assert transport.storage.load_routes() == ROUTES
+    assert list(transport.route_list()) == ['1']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data", "snapshot.gz"]
+
+
+def test_corrupted_snapshot_is_rejected(factory, exported, tmp_path):
+    _rewrite(exported, body=lambda body: body.replace(b'"1"', b'"3"'))
+
+    with pytest.raises(exceptions.InvalidSnapshot, match="Checksum"):
+        factory.import_snapshot(exported)
+    _assert_untouched(factory, tmp_path)
+
+
+def test_snapshot_of_another_version_is_rejected(factory, exported, tmp_path):
+    header, _ = snapshot.read(exported)
+    _rewrite(exported, header=dict(header, version=snapshot.VERSION + 1))
+
+    with pytest.raises(exceptions.InvalidSnapshot, match="version"):
+        factory.import_snapshot(exported)
+    _assert_untouched(factory, tmp_path)
+
+
+def test_unreadable_snapshot_is_rejected(factory, exported, tmp_path):
+    exported.write_bytes(b"not a snapshot")
+
+    with pytest.raises(exceptions.InvalidSnapshot):
+        factory.import_snapshot(exported)
+    _assert_untouched(factory, tmp_path)
+
+
+def test_failed_restore_leaves_the_route_data(factory, exported, tmp_path, monkeypatch):
+    def restore(data, storage):
+        raise OSError("disk full")
+    monkeypatch.setattr(snapshot, "restore", restore)
+
+    with pytest.raises(OSError):
+        factory.import_snapshot(exported)
+    _assert_untouched(factory, tmp_path)
@@ -0,0 +1,56 @@
+"""Rebuild of the route data of `hketa.transport.Transport`."""
+import pytest
+
+from paper_eta.src.libs.hketa import api, enums, transport
+
+
+class _NlbApi:
+    """The NLB API functions on an editable route list, recording the fetched stop lists."""
+
+    def __init__(self, count: int) -> None:
+        self.routes = [{'routeId': str(i), 'routeNo': f"R{i}",
+                        'routeName_e': f"A{i} > B{i}", 'routeName_c': f"甲{i} > 乙{i}"}
+                       for i in range(1, count + 1)]
+        self.fetched: list[str] = []
+
+    async def route_list(self, session=None) -> dict:  # pylint: disable=unused-argument
+        return {'routes': self.routes}
+
+    async def route_stop_list(self, route_id: str, session=None) -> dict:  # pylint: disable=unused-argument
+        self.fetched.append(route_id)
+        return {'stops': [{'stopId': f"{route_id}-{k}", 'stopName_e': f"S{k}",
+                           'stopName_c': f"站{k}", 'fare': '1', 'fareHoliday': '1'}
+                          for k in range(3)]}
+
+    @staticmethod
+    async def revalidate(url, validators, session=None):  # pylint: disable=unused-argument
+        return {'etag': 'modified'}
+
+
+@pytest.mark.parametrize("storage", ("json", "sqlite"))
+def test_delta_sync_refetches_and_prunes_changed_routes_only(monkeypatch, tmp_path, storage):
+    nlb = _NlbApi(50)
+    monkeypatch.setattr(api, "nlb_route_list", nlb.route_list)
+    monkeypatch.setattr(api, "nlb_route_stop_list", nlb.route_stop_list)
+    monkeypatch.setattr(api, "revalidate", nlb.revalidate)
+
+    nlb_bus = transport.NewLantaoBus(tmp_path, storage=storage)
+    assert len(nlb_bus.route_list()) == 50
+    assert len(nlb.fetched) == 50
+    for no in ("R1", "R2", "R3"):
+        nlb_bus.stop_list(no, enums.Direction.OUTBOUND, "1")
+    assert sorted(key[0] for key in nlb_bus.storage.stop_lists()) == ["R1", "R2", "R3"]
+
+    # R2 renamed, R3 removed and R99 added
+    nlb.routes[1] = dict(nlb.routes[1], routeName_e="A2 > C2")
+    del nlb.routes[2]
+    nlb.routes.append({'routeId': '99', 'routeNo': 'R99',
+                       'routeName_e': "A99 > B99", 'routeName_c': "甲99 > 乙99"})
+    nlb.fetched.clear()
+    nlb_bus.refresh_job.run(nlb_bus._rebuild_route_list)  # pylint: disable=protected-access
+
+    assert sorted(nlb.fetched) == ["2", "99"]
+    assert sorted(key[0] for key in nlb_bus.storage.stop_lists()) == ["R1"]
+    routes = nlb_bus.route_list()
+    assert len(routes) == 50
+    assert "R3" not in routes and "R99" in routes
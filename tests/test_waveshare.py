@@ -0,0 +1,25 @@
+"""The controllers of `epdcon.waveshare` against the Waveshare drivers, on a `FakeBackend`."""
+import importlib
+
+import pytest
+
+LIB = "paper_eta.src.libs.epdcon.waveshare"
+
+
+def _stream(backend, func, *args) -> list[tuple[int, bytes]]:
+    backend.reset()
+    func(*args)
+    return backend.stream()
+
+
+@pytest.mark.parametrize("size", ((280, 480), (480, 280), (10, 10)))
+@pytest.mark.parametrize("mode", ('L', '1', 'RGB'))
+def test_epd3in7_display_4gray_matches_driver(backend, draw, size, mode):
+    epd = importlib.import_module(f"{LIB}.epd_lib.epd3in7").EPD()
+    ctl = importlib.import_module(f"{LIB}.epd3in7").Controller(False)
+    image = draw(size, mode)
+
+    expected = _stream(backend, lambda: epd.display_4Gray(epd.getbuffer_4Gray(image)))
+    actual = _stream(backend, ctl._display_4gray, image)  # pylint: disable=protected-access
+
+    assert actual == expected